@@ -38,6 +38,6 @@ good text editor, while still having very good IDE features for Python.
 
 __version__ = '0.9.0'
 
-from jedi.api import Script, Interpreter, NotFoundError, set_debug_function
-from jedi.api import preload_module, defined_names, names
+from jedi.api import Script, Interpreter, Project, NotFoundError, set_debug_function
+from jedi.api import preload_module, warm_cache, defined_names, names
 from jedi import settings
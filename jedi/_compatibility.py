@@ -151,6 +151,13 @@ try:
 except ImportError:
     import __builtin__ as builtins
 
+if is_py3:
+    intern = sys.intern
+else:
+    # Python 2 can only intern byte strings, the parser uses unicode.
+    def intern(string):
+        return string
+
 
 import ast
 
@@ -4,12 +4,17 @@ use its methods.
 
 Additionally you can add a debug function with :func:`set_debug_function`.
 
-.. warning:: Please, note that Jedi is **not thread safe**.
+.. warning:: A :class:`Script` or :class:`Project` must only be used by one
+   thread at a time. Different scripts and projects can be used in parallel
+   threads, the caches that they share are protected by locks.
 """
 import re
 import os
 import warnings
 import sys
+import copy
+import functools
+import traceback
 from itertools import chain
 
 from jedi._compatibility import unicode, builtins
@@ -26,11 +31,11 @@ from jedi.api import classes
 from jedi.api import interpreter
 from jedi.api import usages
 from jedi.api import helpers
+from jedi.api.warm import warm_cache
 from jedi.evaluate import Evaluator
 from jedi.evaluate import representation as er
 from jedi.evaluate import compiled
 from jedi.evaluate import imports
-from jedi.evaluate.cache import memoize_default
 from jedi.evaluate.helpers import FakeName, get_module_names
 from jedi.evaluate.finder import global_names_dict_generator, filter_definition_names
 from jedi.evaluate import analysis
@@ -50,6 +55,25 @@ class NotFoundError(Exception):
     """
 
 
+def _api_method(method):
+    """
+    Starts the time budget of the evaluator when `method` is called, not
+    when the script is created. Methods called by other methods share the
+    budget of the outer one.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._in_api_method:
+            return method(self, *args, **kwargs)
+        self._evaluator.start_time_budget()
+        self._in_api_method = True
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._in_api_method = False
+    return wrapper
+
+
 class Script(object):
     """
     A Script is the base for completions, goto or whatever you want to do with
@@ -74,6 +98,8 @@ class Script(object):
         ``unicode`` object (default ``'utf-8'``).
     :type encoding: str
     """
+    _in_api_method = False
+
     def __init__(self, source=None, line=None, column=None, path=None,
                  encoding='utf-8', source_path=None, source_encoding=None):
         if source_path is not None:
@@ -91,16 +117,8 @@ class Script(object):
                 source = f.read()
 
         self.source = common.source_to_unicode(source, encoding)
-        lines = common.splitlines(self.source)
-        line = max(len(lines), 1) if line is None else line
-        if not (0 < line <= len(lines)):
-            raise ValueError('`line` parameter is not in a valid range.')
-
-        line_len = len(lines[line - 1])
-        column = line_len if column is None else column
-        if not (0 <= column <= line_len):
-            raise ValueError('`column` parameter is not in a valid range.')
-        self._pos = line, column
+        self._lines = common.splitlines(self.source)
+        self._pos = _check_position(self._lines, line, column)
 
         cache.clear_time_caches()
         debug.reset_time()
@@ -124,6 +142,21 @@ class Script(object):
     def __repr__(self):
         return '<%s: %s>' % (self.__class__.__name__, repr(self._orig_path))
 
+    def _with_position(self, line, column):
+        """
+        Returns a copy of this script for another position. The source is not
+        parsed again and the evaluator is shared.
+        """
+        script = copy.copy(self)
+        # Memoized results depend on the position.
+        script.__dict__.pop('_memoize_method_dct', None)
+        script._pos = _check_position(self._lines, line, column)
+        script._user_context = self._user_context.with_position(script._pos)
+        script._parser = self._parser.with_position(script._pos,
+                                                    script._user_context)
+        return script
+
+    @_api_method
     def completions(self):
         """
         Return :class:`classes.Completion` objects. Those objects contain
@@ -217,6 +250,8 @@ class Script(object):
                     comp_dct[k] = new
                     comps.append(new)
 
+        # The members of compiled objects that were introspected.
+        compiled.members.save()
         debug.speed('completions end')
 
         return sorted(comps, key=lambda x: (x.name.startswith('__'),
@@ -289,7 +324,7 @@ class Script(object):
 
         return scopes
 
-    @memoize_default()
+    @cache.memoize_method
     def _get_under_cursor_stmt(self, cursor_txt, start_pos=None):
         tokenizer = source_tokens(cursor_txt)
         r = Parser(self._grammar, cursor_txt, tokenizer=tokenizer)
@@ -313,6 +348,7 @@ class Script(object):
         stmt.parent = self._parser.user_scope()
         return stmt
 
+    @_api_method
     def goto_definitions(self):
         """
         Return the definitions of a the path under the cursor.  goto function!
@@ -360,6 +396,7 @@ class Script(object):
         defs = [classes.Definition(self._evaluator, name) for name in names]
         return helpers.sorted_definitions(set(defs))
 
+    @_api_method
     def goto_assignments(self):
         """
         Return the first definition found. Imports and statements aren't
@@ -450,6 +487,7 @@ class Script(object):
             definitions = follow_inexistent_imports(defs)
         return definitions
 
+    @_api_method
     def usages(self, additional_module_paths=()):
         """
         Return :class:`classes.Definition` objects, which contain all
@@ -461,8 +499,8 @@ class Script(object):
 
         :rtype: list of :class:`classes.Definition`
         """
-        temp, settings.dynamic_flow_information = \
-            settings.dynamic_flow_information, False
+        evaluator = self._evaluator
+        temp, evaluator.flow_information = evaluator.flow_information, False
         try:
             user_stmt = self._parser.user_stmt()
             definitions = self._goto(add_import_name=True)
@@ -482,10 +520,11 @@ class Script(object):
             for d in set(definitions):
                 names.append(classes.Definition(self._evaluator, d))
         finally:
-            settings.dynamic_flow_information = temp
+            evaluator.flow_information = temp
 
         return helpers.sorted_definitions(set(names))
 
+    @_api_method
     def call_signatures(self):
         """
         Return the function object of the call you're currently in.
@@ -510,7 +549,8 @@ class Script(object):
         if stmt is None:
             return []
 
-        with common.scale_speed_settings(settings.scale_call_signatures):
+        with common.scale_speed_settings(self._evaluator,
+                                         settings.scale_call_signatures):
             origins = cache.cache_call_signatures(self._evaluator, stmt,
                                                   self.source, self._pos)
         debug.speed('func_call followed')
@@ -544,6 +584,18 @@ class Script(object):
         return sorted(set(ana), key=lambda x: x.line)
 
 
+def _check_position(lines, line, column):
+    line = max(len(lines), 1) if line is None else line
+    if not (0 < line <= len(lines)):
+        raise ValueError('`line` parameter is not in a valid range.')
+
+    line_len = len(lines[line - 1])
+    column = line_len if column is None else column
+    if not (0 <= column <= line_len):
+        raise ValueError('`column` parameter is not in a valid range.')
+    return line, column
+
+
 class Interpreter(Script):
     """
     Jedi API for Python REPLs.
@@ -631,6 +683,124 @@ class Interpreter(Script):
             return completion_names
 
 
+class Project(object):
+    """
+    A :class:`Project` keeps one evaluator alive for many requests. Every
+    :class:`Script` creates a fresh evaluator, which means that the inference
+    of imported modules like ``numpy`` is done again on every key hit. Scripts
+    created by :meth:`script` share the evaluator of the project and therefore
+    reuse everything that has been inferred before.
+
+    Whenever the source of a buffer changes, the inference results that
+    depend on this buffer are invalidated. All the other results are kept.
+    Buffers stay in memory until they are closed with :meth:`close`, other
+    modules may be evicted, see :data:`jedi.settings.memory_cache_limit`.
+
+    >>> project = Project()
+    >>> script = project.script('import json; json.l', 1, 19, 'example.py')
+    >>> script.completions()                                #doctest: +ELLIPSIS
+    [<Completion: load>, <Completion: loads>]
+    """
+    def __init__(self):
+        self._grammar = load_grammar('grammar%s.%s' % sys.version_info[:2])
+        self._evaluator = Evaluator(self._grammar)
+        self._sources = {}
+        cache.watch_evictions(self._evaluator)
+
+    def script(self, source=None, line=None, column=None, path=None,
+               encoding='utf-8'):
+        """
+        Returns a :class:`Script` that uses the evaluator of this project. The
+        parameters are the same as in :class:`Script`.
+
+        :rtype: :class:`Script`
+        """
+        script = Script(source, line, column, path, encoding)
+        if source is not None:
+            cache.pin(script.path)
+        if self._sources.get(script.path) != script.source:
+            self.invalidate(script.path)
+            self._sources[script.path] = script.source
+
+        self._evaluator.forget_evicted_modules()
+        self._evaluator.reset_recursion_limitations()
+        self._evaluator.analysis = []
+        script._evaluator = self._evaluator
+        return script
+
+    def goto_definitions_many(self, path, positions, source=None,
+                              encoding='utf-8'):
+        """
+        Returns the result of :meth:`Script.goto_definitions` for every
+        ``(line, column)`` tuple in `positions`, in the same order. The source
+        is parsed only once and everything that is inferred for one position
+        is reused for the others.
+
+        :param source: The source of `path`, read from `path` if not given.
+        :rtype: list of lists of :class:`classes.Definition`
+        """
+        script = self.script(source, path=path, encoding=encoding)
+        results = {}
+        for position in positions:
+            position = tuple(position)
+            if position not in results:
+                self._evaluator.reset_recursion_limitations()
+                results[position] = \
+                    script._with_position(*position).goto_definitions()
+        return [results[tuple(position)] for position in positions]
+
+    def reference_edges(self, paths):
+        """
+        Yields an edge from every reference to its definitions for all Python
+        files below `paths`. An edge is a tuple ``(path, line, column,
+        definition_path, definition_line, definition_column)``, the definition
+        path and position are None for builtins. Definitions themselves are
+        not yielded. One evaluator is used for all files.
+
+        :param paths: Directories or files.
+        """
+        for path in sorted(os.path.abspath(f) for f in common.find_files(paths)):
+            script = self.script(path=path)
+            module = script._parser.module()
+            names = sorted(get_module_names(module, all_scopes=True),
+                           key=lambda n: n.start_pos)
+            for name in names:
+                if name.is_definition():
+                    continue
+                self._evaluator.reset_recursion_limitations()
+                try:
+                    definitions = self._evaluator.goto(name)
+                except Exception:
+                    debug.warning('Cannot resolve %s in %s: %s', name, path,
+                                  traceback.format_exc())
+                    continue
+                line, column = name.start_pos
+                for d in set(definitions):
+                    d = classes.Definition(self._evaluator, d)
+                    yield path, line, column, d.module_path, d.line, d.column
+
+    def invalidate(self, path=None):
+        """
+        Forget everything that has been inferred from the module at `path`,
+        because it changed. This is done automatically for the sources passed
+        to :meth:`script`, but files that change on disk have to be reported.
+        """
+        self._sources.pop(path, None)
+        try:
+            module = cache.parser_cache[path].parser.module
+        except KeyError:
+            return  # Never parsed, so nothing can depend on it.
+        self._evaluator.invalidate_module(module)
+
+    def close(self, path):
+        """
+        The buffer of `path` is not edited anymore. Its module may now be
+        evicted from the memory like every other module.
+        """
+        self._sources.pop(path, None)
+        cache.unpin(path)
+
+
 def defined_names(source, path=None, encoding='utf-8'):
     """
     Get all definitions in `source` sorted by its position.
@@ -0,0 +1,140 @@
+"""
+Static analysis of many files at once. :func:`analyze` shares one
+:class:`jedi.Project` between all files, so a module that is imported by many
+others is only inferred once. The errors are yielded as soon as a file is
+done, not at the end.
+
+Errors that are found in a file while another file is analyzed (e.g. because
+it calls a function of that file) are yielded right away. Every error is
+yielded only once.
+
+With more than one worker, the files are handed out to the processes one at a
+time. Each process has its own project, so modules imported by files in
+several processes are inferred more than once, but the files are analyzed at
+the same time.
+
+It's also available on the command line and prints JSON lines with
+``--json``::
+
+    python -m jedi linter [--json] [--workers N] [--debug] [--pdb] path ...
+"""
+import json
+import os
+import sys
+import traceback
+
+from jedi import debug
+from jedi.api import Project, set_debug_function
+from jedi.common import find_files
+from jedi.parser import parallel
+
+
+def error_to_dict(error):
+    """
+    Returns a dict of a :class:`jedi.evaluate.analysis.Error` that can be
+    dumped as JSON.
+    """
+    return {
+        'path': error.path,
+        'line': error.line,
+        'column': error.column,
+        'code': error.code,
+        'name': error.name,
+        'message': error.message,
+    }
+
+
+def _analyze_files(files, project=None, ignore_errors=True, wanted=None):
+    project = Project() if project is None else project
+    wanted = set(files) if wanted is None else wanted
+    reported = set()
+    for path in files:
+        try:
+            project.script(path=path)._analysis()
+        except Exception:
+            if not ignore_errors:
+                raise
+            debug.warning('Cannot analyze %s: %s', path, traceback.format_exc())
+        # The list is reset by the next script, so take everything now.
+        errors = [e for e in project._evaluator.analysis
+                  if e.path in wanted and e not in reported]
+        reported.update(errors)
+        for error in sorted(errors, key=lambda e: (e.path, e.line, e.column)):
+            yield error
+
+
+# The paths of a worker process, its project and the files below the paths,
+# which are the same for all its files.
+_worker_state = None
+
+
+def _analyze_file(args):
+    global _worker_state
+    path, paths = args
+    if _worker_state is None or _worker_state[0] != paths:
+        files = set(os.path.abspath(f) for f in find_files(paths))
+        _worker_state = paths, Project(), files
+    _, project, wanted = _worker_state
+    return list(_analyze_files([path], project, wanted=wanted))
+
+
+def analyze(paths, workers=1, project=None, ignore_errors=True):
+    """
+    Analyzes all Python files below `paths` and yields the errors as
+    :class:`jedi.evaluate.analysis.Error` objects.
+
+    :param paths: Directories or files.
+    :param workers: The number of processes, the files are distributed
+        between them. Every process keeps one project for all its files.
+        With ``1`` everything is done in this process.
+    :param project: The :class:`jedi.Project` to use if everything is done in
+        this process. A new one by default.
+    :param ignore_errors: If False, exceptions of |jedi| while analyzing a
+        file are raised instead of just skipping the rest of the file.
+    """
+    files = sorted(os.path.abspath(f) for f in find_files(paths))
+    if workers <= 1 or len(files) <= 1:
+        for error in _analyze_files(files, project, ignore_errors):
+            yield error
+        return
+
+    # One file at a time, so errors are yielded as soon as a file is done.
+    pool = parallel.create_pool(min(workers, len(files)))
+    try:
+        reported = set()
+        tasks = [(path, tuple(paths)) for path in files]
+        for errors in pool.imap_unordered(_analyze_file, tasks):
+            for error in errors:
+                if error not in reported:
+                    reported.add(error)
+                    yield error
+    finally:
+        pool.close()
+        pool.join()
+
+
+def main(args):
+    if '--debug' in args:
+        set_debug_function()
+    workers = 1
+    if '--workers' in args:
+        index = args.index('--workers')
+        workers = int(args[index + 1])
+        args = args[:index] + args[index + 2:]
+    as_json = '--json' in args
+    use_pdb = '--pdb' in args
+
+    paths = [arg for arg in args if not arg.startswith('--')]
+    try:
+        for error in analyze(paths, workers, ignore_errors=not use_pdb):
+            if as_json:
+                print(json.dumps(error_to_dict(error)))
+            else:
+                print(error)
+            sys.stdout.flush()
+    except Exception:
+        if use_pdb:
+            import pdb
+            pdb.post_mortem()
+        else:
+            raise
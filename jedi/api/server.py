@@ -0,0 +1,158 @@
+"""
+A long living process that answers requests of editors. Starting a new
+process (or creating a new :class:`jedi.Script`) for every key hit means that
+modules like ``numpy`` have to be inferred again and again. The server keeps a
+:class:`jedi.Project` and with that all parsed modules and inference results
+alive between requests.
+
+Start it with ``python -m jedi serve``. It reads requests from stdin and writes
+responses to stdout. Use ``python -m jedi serve --socket /path/to/socket`` to
+listen on a Unix socket instead.
+
+The protocol is line based, each line is a JSON object::
+
+    {"id": 1, "method": "completions",
+     "params": {"source": "import json; json.l", "line": 1, "column": 19,
+                "path": "example.py"}}
+
+And the answer is also exactly one line::
+
+    {"id": 1, "result": [{"name": "load", "complete": "oad", ...}, ...]}
+
+If something goes wrong, the answer contains an ``error`` key instead of a
+``result``. The methods ``completions``, ``goto_definitions``,
+``goto_assignments``, ``usages`` and ``call_signatures`` take the parameters
+of :class:`jedi.Script`. ``invalidate`` takes a ``path`` of a file that changed
+on disk and ``shutdown`` stops the server.
+"""
+import json
+import os
+import socket
+import sys
+import traceback
+
+from jedi import debug
+from jedi.api import Project
+
+
+def _definition_to_dict(definition):
+    return {
+        'name': definition.name,
+        'type': definition.type,
+        'module_path': definition.module_path,
+        'line': definition.line,
+        'column': definition.column,
+        'description': definition.description,
+    }
+
+
+def _completion_to_dict(completion):
+    dct = _definition_to_dict(completion)
+    dct['complete'] = completion.complete
+    return dct
+
+
+def _call_signature_to_dict(signature):
+    dct = _definition_to_dict(signature)
+    dct['index'] = signature.index
+    dct['params'] = [p.name for p in signature.params]
+    return dct
+
+
+class Server(object):
+    """
+    Answers requests with the help of a :class:`jedi.Project`. The requests
+    are handled one after another, because a project must only be used by one
+    thread at a time.
+    """
+    _script_methods = {
+        'completions': _completion_to_dict,
+        'goto_definitions': _definition_to_dict,
+        'goto_assignments': _definition_to_dict,
+        'usages': _definition_to_dict,
+        'call_signatures': _call_signature_to_dict,
+    }
+
+    def __init__(self, project=None):
+        self.project = Project() if project is None else project
+        self.running = True
+
+    def handle(self, request):
+        """
+        Executes one request (a dict) and returns the response (a dict).
+        """
+        response = {'id': request.get('id')}
+        try:
+            response['result'] = self._execute(request.get('method'),
+                                               request.get('params') or {})
+        except Exception as e:
+            debug.warning('server request failed: %s', traceback.format_exc())
+            response['error'] = '%s: %s' % (type(e).__name__, e)
+        return response
+
+    def _execute(self, method, params):
+        if method in self._script_methods:
+            script = self.project.script(**params)
+            to_dict = self._script_methods[method]
+            return [to_dict(d) for d in getattr(script, method)()]
+        elif method == 'invalidate':
+            self.project.invalidate(os.path.abspath(params['path']))
+            return None
+        elif method == 'shutdown':
+            self.running = False
+            return None
+        raise ValueError('Unknown method %r' % method)
+
+    def handle_line(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = {'id': None, 'error': 'Invalid JSON: %s' % e}
+        else:
+            response = self.handle(request)
+        return json.dumps(response)
+
+    def serve(self, infile, outfile):
+        """
+        Reads requests from the file `infile` until it is closed or a
+        ``shutdown`` request arrives. The responses are written to `outfile`.
+        """
+        while self.running:
+            line = infile.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            outfile.write(self.handle_line(line) + '\n')
+            outfile.flush()
+
+    def serve_unix_socket(self, path):
+        """
+        Listens on the Unix socket `path`. Connections are served one after
+        another.
+        """
+        if os.path.exists(path):
+            os.remove(path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(path)
+            sock.listen(1)
+            while self.running:
+                connection, _ = sock.accept()
+                stream = connection.makefile('rw')
+                try:
+                    self.serve(stream, stream)
+                finally:
+                    stream.close()
+                    connection.close()
+        finally:
+            sock.close()
+            os.remove(path)
+
+
+def main(args):
+    server = Server()
+    if '--socket' in args:
+        server.serve_unix_socket(args[args.index('--socket') + 1])
+    else:
+        server.serve(sys.stdin, sys.stdout)
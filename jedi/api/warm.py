@@ -0,0 +1,127 @@
+"""
+Fills the file system cache before it's needed. After installing packages
+into a fresh virtualenv, the first completion would otherwise have to parse
+big modules like ``numpy`` while the user is waiting.
+
+:func:`warm_cache` parses all Python files below the given paths (by default
+:func:`jedi.evaluate.sys_path.get_sys_path`, which includes the site-packages
+of the active virtualenv) with a pool of processes. Modules that are already
+cached and haven't changed since are skipped.
+
+With ``compiled=True`` it also imports the builtin modules and the C
+extensions below the paths in other processes and stores the tables of their
+members (see :mod:`jedi.evaluate.compiled.members`): types, params, return
+types and docstrings, which are otherwise built with ``dir()``, ``getattr()``
+and ``inspect`` the first time they are completed. The modules themselves are
+still imported when they are used, the tables are found by their version.
+
+It's also available on the command line::
+
+    python -m jedi warm [--workers N] [--compiled] [path ...]
+"""
+import multiprocessing
+import sys
+
+from jedi import common
+from jedi import debug
+from jedi import settings
+from jedi.evaluate.compiled import members, dotted_from_fs_path
+from jedi.evaluate.compiled import _build_member_table
+from jedi.evaluate.sys_path import get_sys_path
+from jedi.parser import parallel
+
+try:
+    from importlib.machinery import EXTENSION_SUFFIXES as _extension_suffixes
+except ImportError:
+    _extension_suffixes = ['.so', '.pyd']
+
+# Seconds after which the import of a compiled module is considered to hang.
+_timeout = 60.0
+
+
+def _build_member_tables(dotted_path):
+    """Runs in a worker and returns the number of tables that were built."""
+    try:
+        __import__(dotted_path)
+        module = sys.modules[dotted_path]
+    except Exception as e:
+        debug.warning('Module %s not importable: %s', dotted_path, e)
+        return 0
+    return members.build_all(module, _build_member_table)
+
+
+def _compiled_module_names(paths):
+    names = [n for n in sys.builtin_module_names if n != '__main__']
+    sys_path = get_sys_path()
+    for path in common.find_files(paths, _extension_suffixes):
+        name = dotted_from_fs_path(path, sys_path)
+        if name:
+            names.append(name)
+    return names
+
+
+def _warm_compiled(paths, workers):
+    """
+    Builds the member tables of compiled modules. Importing them can crash
+    or hang, so it always happens in other processes.
+    """
+    names = _compiled_module_names(paths)
+    debug.dbg('Building the member tables of %s modules', len(names))
+    pool = parallel.create_pool(workers)
+    try:
+        results = [pool.apply_async(_build_member_tables, (name,))
+                   for name in names]
+        count = 0
+        for name, result in zip(names, results):
+            try:
+                count += result.get(_timeout)
+            except multiprocessing.TimeoutError:
+                debug.warning('Importing %s timed out.', name)
+        return count
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def warm_cache(paths=None, workers=None, chunk_size=20, compiled=False):
+    """
+    Parses all Python files below `paths` and writes them to the file system
+    cache.
+
+    :param paths: Directories or files, :func:`get_sys_path` by default.
+    :param workers: The number of processes, by default the number of CPUs.
+        With ``1`` everything is done in this process.
+    :param chunk_size: The number of files that a process parses and saves
+        at once.
+    :param compiled: Also store the members of builtin modules and of the C
+        extensions below `paths`. They are still imported when they are
+        used, but not introspected anymore.
+    :return: The number of modules and member tables that have been cached.
+    """
+    if not settings.use_filesystem_cache:
+        debug.warning('The file system cache is disabled.')
+        return 0
+    if paths is None:
+        paths = get_sys_path()
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    files = parallel.outdated(common.find_files(paths))
+    debug.dbg('Warming the cache with %s files', len(files))
+    count = parallel.parse_files(files, workers, chunk_size)
+    if compiled:
+        count += _warm_compiled(paths, workers)
+    return count
+
+
+def main(args):
+    workers = None
+    if '--workers' in args:
+        index = args.index('--workers')
+        workers = int(args[index + 1])
+        args = args[:index] + args[index + 2:]
+    compiled = '--compiled' in args
+    if compiled:
+        args.remove('--compiled')
+    count = warm_cache(args or None, workers, compiled=compiled)
+    print('Cached %s modules in %s' % (count, settings.cache_directory))
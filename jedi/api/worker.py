@@ -0,0 +1,186 @@
+"""
+Runs requests in a background thread, so that an editor (or an asyncio event
+loop) never blocks while |jedi| is inferring. Requests can be cancelled and
+can have a deadline. Both stop the inference at the next recursion check
+(see :meth:`jedi.evaluate.Evaluator.is_stopped`) and the request returns what
+has been found until then. If the user keeps typing, the stale completion can
+just be cancelled.
+
+All requests run one after another in the same thread with the same
+:class:`jedi.Project`, because a project must only be used by one thread at a
+time. A request is a function that gets the project and returns plain data.
+Don't return :class:`jedi.api.classes.Definition` objects, their attributes
+are inferred lazily and therefore in the wrong thread::
+
+    worker = Worker()
+    request = worker.submit(
+        lambda project: [c.name for c in
+                         project.script(source, line, column).completions()],
+        timeout=0.5
+    )
+    names = request.result()
+
+With asyncio, use :meth:`Worker.submit_async` and ``await`` the future that
+it returns. Cancelling that future cancels the request.
+"""
+import threading
+import time
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from jedi import debug
+from jedi.api import Project
+
+
+class CancelledError(Exception):
+    """Raised by :meth:`Request.result` if the request never ran."""
+
+
+class Request(object):
+    """
+    A request that is executed by a :class:`Worker`. Similar to a
+    ``concurrent.futures.Future``.
+    """
+    def __init__(self, function, args, timeout):
+        self._function = function
+        self._args = args
+        self._timeout = timeout
+        self._done_event = threading.Event()
+        self._cancel_event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._result = None
+        self._exception = None
+
+    def cancel(self):
+        """
+        Cancels the request. If it's running, inference stops and the result
+        is whatever has been found until now.
+        """
+        self._cancel_event.set()
+
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def done(self):
+        return self._done_event.is_set()
+
+    def result(self, timeout=None):
+        """
+        Waits for the request and returns its result. Raises the exception of
+        the request, :class:`CancelledError` if it was cancelled before it
+        started, or ``RuntimeError`` if `timeout` seconds have passed.
+        """
+        if not self._done_event.wait(timeout):
+            raise RuntimeError('The request is not done yet.')
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def add_done_callback(self, callback):
+        """
+        Calls `callback` with the request when it's done. It's called in the
+        thread of the worker or right away if the request is done already.
+        """
+        with self._lock:
+            if not self.done():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _run(self, project):
+        evaluator = project._evaluator
+        if self.cancelled():
+            self._exception = CancelledError()
+        else:
+            evaluator.reset_recursion_limitations()
+            evaluator.cancel_event = self._cancel_event
+            if self._timeout is not None:
+                evaluator.deadline = time.time() + self._timeout
+            try:
+                self._result = self._function(project, *self._args)
+            except Exception as e:
+                self._exception = e
+            finally:
+                evaluator.cancel_event = None
+                evaluator.deadline = None
+
+        with self._lock:
+            self._done_event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception:
+                debug.warning('Request callback failed: %s', callback)
+
+
+class Worker(object):
+    """
+    Executes :class:`Request` objects in a daemon thread.
+
+    :param project: The :class:`jedi.Project` that is passed to the requests,
+        a new one by default. Don't use it in other threads.
+    """
+    def __init__(self, project=None):
+        self.project = Project() if project is None else project
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._work)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, function, args=(), timeout=None):
+        """
+        Calls ``function(project, *args)`` in the worker thread.
+
+        :param timeout: Seconds after which inference stops and `function`
+            gets partial results.
+        :rtype: :class:`Request`
+        """
+        request = Request(function, args, timeout)
+        self._queue.put(request)
+        return request
+
+    def submit_async(self, function, args=(), timeout=None, loop=None):
+        """
+        Like :meth:`submit`, but returns an ``asyncio.Future``. Cancelling the
+        future cancels the request.
+        """
+        import asyncio
+        loop = asyncio.get_event_loop() if loop is None else loop
+        future = loop.create_future()
+        request = self.submit(function, args, timeout)
+
+        def set_result(request):
+            if future.cancelled():
+                return
+            try:
+                future.set_result(request.result())
+            except Exception as e:
+                future.set_exception(e)
+
+        def cancel_request(future):
+            if future.cancelled():
+                request.cancel()
+
+        future.add_done_callback(cancel_request)
+        request.add_done_callback(
+            lambda request: loop.call_soon_threadsafe(set_result, request))
+        return future
+
+    def shutdown(self, wait=True):
+        """
+        Stops the worker after the requests that have been submitted.
+        """
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+    def _work(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                break
+            request._run(self.project)
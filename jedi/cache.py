@@ -3,29 +3,38 @@ This caching is very important for speed and memory optimizations. There's
 nothing really spectacular, just some decorators. The following cache types are
 available:
 
-- module caching (`load_parser` and `save_parser`), which uses pickle and is
-  really important to assure low load times of modules like ``numpy``.
+- module caching (`load_parser` and `save_parser`), which uses
+  :mod:`jedi.parser.serialize` and sqlite and is really important to assure
+  low load times of modules like ``numpy``. The modules in memory are limited
+  by :data:`jedi.settings.memory_cache_limit`.
 - ``time_cache`` can be used to cache something for just a limited time span,
   which can be useful if there's user interaction and the user cannot react
   faster than a certain time.
 
-This module is one of the reasons why |jedi| is not thread-safe. As you can see
-there are global variables, which are holding the cache information. Some of
-these variables are being cleaned after every API usage.
+The caches are global variables that are shared by all threads. They are only
+changed while holding ``_lock``, the inference that fills them runs without
+it. Some of these variables are being cleaned after every API usage.
 """
 import time
 import os
+import threading
+import weakref
 import sys
-import json
 import hashlib
 import gc
 import inspect
 import shutil
 import re
+import marshal
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
+try:
+    import sqlite3
+except ImportError:
+    # Some Python builds come without sqlite.
+    sqlite3 = None
 
 from jedi import settings
 from jedi import common
@@ -33,16 +42,33 @@ from jedi import debug
 
 _time_caches = {}
 
+# Protects the module level caches of this module.
+_lock = threading.RLock()
+
 # for fast_parser, should not be deleted
 parser_cache = {}
 
+# Paths that are never evicted from `parser_cache`, see `pin`.
+pinned_paths = set()
+
+# The number of lines of the modules in `parser_cache` by key and in total,
+# kept up to date by `_add_parser` and `_evict_parsers`.
+_line_counts = {}
+_total_lines = 0
+
+# Evaluators that live longer than one API call and are therefore told about
+# evicted modules, see `watch_evictions`.
+_watching_evaluators = weakref.WeakSet()
+
 
 class ParserCacheItem(object):
-    def __init__(self, parser, change_time=None):
+    def __init__(self, parser, change_time=None, content_hash=None):
         self.parser = parser
         if change_time is None:
             change_time = time.time()
         self.change_time = change_time
+        self.content_hash = content_hash
+        self.last_used = time.time()
 
 
 def clear_time_caches(delete_all=False):
@@ -52,20 +78,23 @@ def clear_time_caches(delete_all=False):
     :param delete_all: Deletes also the cache that is normally not deleted,
         like parser cache, which is important for faster parsing.
     """
-    global _time_caches
-
-    if delete_all:
-        for cache in _time_caches.values():
-            cache.clear()
-        parser_cache.clear()
-    else:
-        # normally just kill the expired entries, not all
-        for tc in _time_caches.values():
-            # check time_cache for expired entries
-            for key, (t, value) in list(tc.items()):
-                if t < time.time():
-                    # delete expired entries
-                    del tc[key]
+    global _time_caches, _total_lines
+
+    with _lock:
+        if delete_all:
+            for cache in _time_caches.values():
+                cache.clear()
+            parser_cache.clear()
+            _line_counts.clear()
+            _total_lines = 0
+        else:
+            # normally just kill the expired entries, not all
+            for tc in _time_caches.values():
+                # check time_cache for expired entries
+                for key, (t, value) in list(tc.items()):
+                    if t < time.time():
+                        # delete expired entries
+                        del tc[key]
 
 
 def time_cache(time_add_setting):
@@ -93,7 +122,8 @@ def time_cache(time_add_setting):
             value = next(generator)
             time_add = getattr(settings, time_add_setting)
             if key is not None:
-                dct[key] = time.time() + time_add, value
+                with _lock:
+                    dct[key] = time.time() + time_add, value
             return value
         return wrapper
     return _temp
@@ -173,12 +203,7 @@ def cache_star_import(func):
 
 def _invalidate_star_import_cache_module(module, only_main=False):
     """ Important if some new modules are being reparsed """
-    try:
-        t, modules = _time_caches['star_import_cache_validity'][module]
-    except KeyError:
-        pass
-    else:
-        del _time_caches['star_import_cache_validity'][module]
+    _time_caches['star_import_cache_validity'].pop(module, None)
 
 
 def invalidate_star_import_cache(path):
@@ -191,46 +216,193 @@ def invalidate_star_import_cache(path):
         _invalidate_star_import_cache_module(parser_cache_item.parser.module)
 
 
-def load_parser(path, name):
+def load_parser(path, name, key=None):
     """
     Returns the module or None, if it fails.
+
+    :param key: The key of the cache entry instead of `path` or `name`, for
+        modules that are generated from `path` (see :func:`save_parser`).
     """
     if path is None and name is None:
         return None
 
     p_time = os.path.getmtime(path) if path else None
-    n = name if path is None else path
+    n = key or (name if path is None else path)
+    content_hash = None
     try:
         parser_cache_item = parser_cache[n]
         if not path or p_time <= parser_cache_item.change_time:
+            parser_cache_item.last_used = time.time()
             return parser_cache_item.parser
-        else:
-            # In case there is already a module cached and this module
-            # has to be reparsed, we also need to invalidate the import
-            # caches.
-            _invalidate_star_import_cache_module(parser_cache_item.parser.module)
+        if settings.filesystem_cache_by_content:
+            content_hash = _content_hash(path)
+            if content_hash == parser_cache_item.content_hash:
+                parser_cache_item.change_time = p_time
+                parser_cache_item.last_used = time.time()
+                return parser_cache_item.parser
+        # In case there is already a module cached and this module
+        # has to be reparsed, we also need to invalidate the import
+        # caches.
+        _invalidate_star_import_cache_module(parser_cache_item.parser.module)
     except KeyError:
         if settings.use_filesystem_cache:
-            return ParserPickling.load_parser(n, p_time)
+            if path and settings.filesystem_cache_by_content and key is None:
+                content_hash = _content_hash(path)
+            return ParserPickling.load_parser(n, p_time, content_hash)
 
 
-def save_parser(path, name, parser, pickling=True):
+def save_parser(path, name, parser, pickling=True, key=None):
+    """
+    Caches `parser`, which has been created from `path` or `name`.
+
+    :param key: The key of the cache entry instead of `path` or `name`. The
+        entry is still outdated when `path` changes, but it's never used for
+        `path` itself, e.g. a stub of a compiled module.
+    """
+    content_hash = None
     try:
         p_time = None if not path else os.path.getmtime(path)
-    except OSError:
+        # Entries with a key are not found by the content of `path`.
+        if path and settings.filesystem_cache_by_content and key is None:
+            content_hash = _content_hash(path)
+    except (OSError, IOError):
         p_time = None
         pickling = False
 
-    n = name if path is None else path
-    item = ParserCacheItem(parser, p_time)
-    parser_cache[n] = item
+    n = key or (name if path is None else path)
+    item = ParserCacheItem(parser, p_time, content_hash)
+    with _lock:
+        _add_parser(n, item)
     if settings.use_filesystem_cache and pickling:
         ParserPickling.save_parser(n, item)
 
 
+def pin(path):
+    """
+    Keeps the module at `path` in memory, even if there are more modules than
+    :data:`jedi.settings.memory_cache_limit` allows.
+    """
+    with _lock:
+        pinned_paths.add(path)
+
+
+def unpin(path):
+    with _lock:
+        pinned_paths.discard(path)
+
+
+def watch_evictions(evaluator):
+    """
+    Adds the modules that are evicted from the memory from now on to
+    ``evaluator.evicted_modules``. The evaluator has to forget them itself,
+    in its own thread.
+    """
+    _watching_evaluators.add(evaluator)
+
+
+def _add_parser(key, item):
+    """Stores `item` in `parser_cache`, the caller holds `_lock`."""
+    global _total_lines
+    parser_cache[key] = item
+    _total_lines -= _line_counts.pop(key, 0)
+    if settings.memory_cache_limit is not None:
+        _line_counts[key] = item.parser.module.end_pos[0]
+        _total_lines += _line_counts[key]
+        _evict_parsers(key)
+
+
+def _sync_line_counts():
+    """
+    Counts the modules that were added to or removed from `parser_cache`
+    directly (e.g. by tests) or while no limit was set.
+    """
+    global _total_lines
+    for key in set(_line_counts) - set(parser_cache):
+        _total_lines -= _line_counts.pop(key)
+    for key in set(parser_cache) - set(_line_counts):
+        _line_counts[key] = parser_cache[key].parser.module.end_pos[0]
+        _total_lines += _line_counts[key]
+
+
+def _evict_parsers(keep):
+    """
+    Removes the least recently used modules except `keep` until the number of
+    lines in memory is within :data:`jedi.settings.memory_cache_limit`.
+    """
+    global _total_lines
+    limit = settings.memory_cache_limit
+    if limit is None or _total_lines <= limit:
+        return
+    _sync_line_counts()
+    if _total_lines <= limit:
+        return
+
+    keys = [key for key in parser_cache
+            if key != keep and key not in pinned_paths]
+    keys.sort(key=lambda key: parser_cache[key].last_used)
+    evicted = []
+    for key in keys:
+        if _total_lines <= limit:
+            break
+        module = parser_cache.pop(key).parser.module
+        _invalidate_star_import_cache_module(module)
+        evicted.append(module)
+        _total_lines -= _line_counts.pop(key)
+    for evaluator in _watching_evaluators:
+        for module in evicted:
+            evaluator.evicted_modules.append(module)
+    debug.dbg('Evicted %s modules from memory', len(evicted))
+
+
+def _content_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _relocate(parser, path):
+    """
+    Changes the path of a parser that was cached for the same source at
+    another place.
+    """
+    module = parser.module
+    for m in [module] + getattr(module, 'modules', []):
+        m.path = path
+        try:
+            del m._name  # Remove the name cache.
+        except AttributeError:
+            pass  # It was never used.
+    if hasattr(parser, 'module_path'):
+        parser.module_path = path
+
+
+class _ConnectionState(threading.local):
+    def __init__(self):
+        self.connection = None
+        self.database_path = None
+        self.pid = None
+        self.touched = []
+
+
 class ParserPickling(object):
+    """
+    The file system cache of parsed modules. All modules are stored in one
+    sqlite database per Python version, which avoids opening thousands of
+    small files on a cold start. Lookups are done by path and modification
+    time, or with :data:`jedi.settings.filesystem_cache_by_content` by the
+    hash of the source. If the database grows bigger than
+    :data:`jedi.settings.filesystem_cache_limit`, the modules that haven't
+    been used for the longest time are deleted.
+
+    Next to the modules, an index of the names that they use is stored, see
+    :meth:`find_name`. It's updated whenever a module is saved.
+
+    Multiple processes may share one cache directory. sqlite does the locking
+    and every write is a transaction. Each entry carries a checksum of its
+    data, broken entries are ignored. Errors of the database are never
+    raised, they just lead to a reparse.
+    """
 
-    version = 24
+    version = 31
     """
     Version number (integer) for file system cache.
 
@@ -244,7 +416,9 @@ class ParserPickling(object):
     """
 
     def __init__(self):
-        self.__index = None
+        # sqlite connections can only be used in the thread that created
+        # them, therefore every thread has its own.
+        self._state = _ConnectionState()
         self.py_tag = 'cpython-%s%s' % sys.version_info[:2]
         """
         Short name for distinguish Python implementations and versions.
@@ -256,77 +430,352 @@ class ParserPickling(object):
         .. todo:: Detect interpreter (e.g., PyPy).
         """
 
-    def load_parser(self, path, original_changed_time):
+    lock_timeout = 10.0
+    """
+    Seconds to wait for other processes that are writing to the cache.
+    """
+
+    def load_parser(self, path, original_changed_time, content_hash=None):
+        """
+        Returns the cached parser of `path` or None. If `content_hash` is
+        given, the modification time is not checked and a parser cached for
+        the same content at another path is used as well.
+        """
+        connection = self._connection
+        if connection is None:
+            return None
+
         try:
-            pickle_changed_time = self._index[path]
-        except KeyError:
+            if content_hash is None:
+                row = connection.execute(
+                    'SELECT path, change_time, content_hash, checksum, format, '
+                    'data FROM parsers WHERE path = ?', (path,)
+                ).fetchone()
+            else:
+                row = connection.execute(
+                    'SELECT path, change_time, content_hash, checksum, format, '
+                    'data FROM parsers WHERE content_hash = ? '
+                    'ORDER BY path = ? DESC LIMIT 1',
+                    (content_hash, path)
+                ).fetchone()
+        except sqlite3.DatabaseError as e:
+            debug.warning('Cannot read the file system cache: %s', e)
+            return None
+        if row is None:
             return None
-        if original_changed_time is not None \
+        cached_path, pickle_changed_time, cached_hash, checksum, format, \
+            data = row
+        if content_hash is None and original_changed_time is not None \
                 and pickle_changed_time < original_changed_time:
             # the pickle file is outdated
             return None
+        if hashlib.sha1(data).hexdigest() != checksum:
+            debug.warning('Broken entry in the file system cache: %s', path)
+            return None
 
-        with open(self._get_hashed_path(path), 'rb') as f:
-            try:
-                gc.disable()
-                parser_cache_item = pickle.load(f)
-            finally:
-                gc.enable()
-
+        try:
+            gc.disable()
+            # Only copies on Python 2, where sqlite returns a buffer.
+            data = bytes(data)
+            if format == 'tree':
+                from jedi.parser import serialize
+                parser_cache_item = ParserCacheItem(serialize.loads(data),
+                                                    pickle_changed_time,
+                                                    cached_hash)
+            else:
+                parser_cache_item = pickle.loads(data)
+        except ValueError as e:
+            debug.warning('Cannot load %s from the file system cache: %s',
+                          path, e)
+            return None
+        finally:
+            gc.enable()
+
+        if content_hash is not None:
+            parser_cache_item.change_time = original_changed_time
+            if cached_path != path:
+                debug.dbg('pickle of %s relocated to %s', cached_path, path)
+                _relocate(parser_cache_item.parser, path)
+        self._touch(cached_path)
         debug.dbg('pickle loaded: %s', path)
-        parser_cache[path] = parser_cache_item
+        parser_cache_item.last_used = time.time()
+        with _lock:
+            _add_parser(path, parser_cache_item)
         return parser_cache_item.parser
 
     def save_parser(self, path, parser_cache_item):
-        self.__index = None
+        self.save_parsers([(path, parser_cache_item)])
+
+    def save_parsers(self, items):
+        """
+        Saves a list of ``(path, parser_cache_item)`` pairs in one
+        transaction.
+        """
+        if self._connection is None:
+            return
+
+        now = time.time()
+        rows = []
+        name_rows = []
+        for path, parser_cache_item in items:
+            format, data = self._dumps(parser_cache_item)
+            rows.append((path, parser_cache_item.change_time,
+                         parser_cache_item.content_hash, now, len(data),
+                         hashlib.sha1(data).hexdigest(), format,
+                         sqlite3.Binary(data)))
+            name_rows += self._name_rows(path, parser_cache_item.parser)
+        self._write(rows, name_rows)
+
+    def _name_rows(self, path, parser):
         try:
-            files = self._index
-        except KeyError:
-            files = {}
-            self._index = files
+            used_names = parser.module.used_names
+        except AttributeError:
+            return []
+        rows = []
+        for name, names in used_names.items():
+            positions = tuple(i for n in names for i in n.start_pos)
+            rows.append((name, path, sqlite3.Binary(marshal.dumps(positions))))
+        return rows
+
+    def _dumps(self, parser_cache_item):
+        """
+        Returns the format and the data of the item. Parsers are stored with
+        :mod:`jedi.parser.serialize`, which is smaller and faster to load
+        than pickle, everything else is pickled.
+        """
+        from jedi.parser import serialize
+        if serialize.can_dump(parser_cache_item.parser):
+            try:
+                return 'tree', serialize.dumps(parser_cache_item.parser)
+            except TypeError as e:
+                debug.warning('Cannot serialize %s, pickling it: %s',
+                              parser_cache_item.parser, e)
+        return 'pickle', pickle.dumps(parser_cache_item, pickle.HIGHEST_PROTOCOL)
 
-        with open(self._get_hashed_path(path), 'wb') as f:
-            pickle.dump(parser_cache_item, f, pickle.HIGHEST_PROTOCOL)
-            files[path] = parser_cache_item.change_time
+    def _write(self, rows, name_rows=()):
+        """
+        Writes `rows`, their `name_rows` and the usage times of modules in one
+        transaction.
+        """
+        try:
+            with self._connection as connection:
+                connection.executemany(
+                    'UPDATE parsers SET last_used = ? WHERE path = ?',
+                    self._state.touched
+                )
+                self._state.touched = []
+                if rows:
+                    connection.executemany(
+                        'INSERT OR REPLACE INTO parsers (path, change_time, '
+                        'content_hash, last_used, size, checksum, format, '
+                        'data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows
+                    )
+                    connection.executemany('DELETE FROM names WHERE path = ?',
+                                           [(row[0],) for row in rows])
+                    connection.executemany(
+                        'INSERT INTO names (name, path, positions) '
+                        'VALUES (?, ?, ?)', name_rows
+                    )
+                    self._evict(connection)
+        except sqlite3.DatabaseError as e:
+            # Probably locked by another process for too long.
+            debug.warning('Cannot write to the file system cache: %s', e)
+
+    def change_times(self, paths=None):
+        """
+        Returns a dict of the cached paths and their modification times, of
+        all of them or only of `paths`.
+        """
+        if self._connection is None:
+            return {}
+        try:
+            if paths is None:
+                return dict(self._connection.execute(
+                    'SELECT path, change_time FROM parsers'
+                ).fetchall())
+            paths = list(paths)
+            result = {}
+            # SQLite limits the number of parameters of a query.
+            for i in range(0, len(paths), 500):
+                chunk = paths[i:i + 500]
+                result.update(self._connection.execute(
+                    'SELECT path, change_time FROM parsers WHERE path IN (%s)'
+                    % ', '.join('?' * len(chunk)), chunk
+                ).fetchall())
+            return result
+        except sqlite3.DatabaseError as e:
+            debug.warning('Cannot read the file system cache: %s', e)
+            return {}
 
-        self._flush_index()
+    def find_name(self, name, paths=None):
+        """
+        Looks `name` up in the index of used names. Returns a dict of the
+        cached paths (of all of them or only of `paths`) whose modules use
+        `name` and the ``(line, column)`` positions of the usages.
 
-    @property
-    def _index(self):
-        if self.__index is None:
+        The index is as current as the cached modules, compare the times of
+        :meth:`change_times` with the files before trusting it.
+        """
+        if self._connection is None:
+            return {}
+        try:
+            rows = self._connection.execute(
+                'SELECT path, positions FROM names WHERE name = ?', (name,)
+            ).fetchall()
+        except sqlite3.DatabaseError as e:
+            debug.warning('Cannot read the file system cache: %s', e)
+            return {}
+        if paths is not None:
+            paths = set(paths)
+        result = {}
+        for path, positions in rows:
+            if paths is None or path in paths:
+                positions = iter(marshal.loads(bytes(positions)))
+                result[path] = list(zip(positions, positions))
+        return result
+
+    def _touch(self, path):
+        """
+        Remembers that a module has been used. To avoid a write for every
+        read, this is written to the database with the next write.
+        """
+        self._state.touched.append((time.time(), path))
+        if len(self._state.touched) > 100:
+            self._flush_touched()
+
+    def _flush_touched(self):
+        """
+        Writes the usage times if nobody else is writing. Reads must not wait
+        for the write lock and the times are only used to choose the modules
+        that are evicted, so they are dropped otherwise.
+        """
+        connection = self._connection
+        touched, self._state.touched = self._state.touched, []
+        if connection is None:
+            return
+        try:
+            connection.execute('PRAGMA busy_timeout = 0')
             try:
-                with open(self._get_path('index.json')) as f:
-                    data = json.load(f)
-            except (IOError, ValueError):
-                self.__index = {}
+                with connection:
+                    connection.executemany(
+                        'UPDATE parsers SET last_used = ? WHERE path = ?',
+                        touched
+                    )
+            finally:
+                connection.execute('PRAGMA busy_timeout = %d'
+                                   % (self.lock_timeout * 1000))
+        except sqlite3.DatabaseError as e:
+            debug.dbg('Usage times not written to the file system cache: %s', e)
+
+    def _evict(self, connection):
+        limit = settings.filesystem_cache_limit
+        if limit is None:
+            return
+        size, = connection.execute('SELECT TOTAL(size) FROM parsers').fetchone()
+        if size <= limit:
+            return
+
+        rows = connection.execute('SELECT path, size FROM parsers '
+                                  'ORDER BY last_used').fetchall()
+        removed = []
+        for path, row_size in rows:
+            if size <= limit:
+                break
+            size -= row_size
+            removed.append((path,))
+        debug.dbg('Evict %s modules from the file system cache', len(removed))
+        connection.executemany('DELETE FROM parsers WHERE path = ?', removed)
+        connection.executemany('DELETE FROM names WHERE path = ?', removed)
+
+    @property
+    def _connection(self):
+        """
+        The connection to the database of the current cache directory or
+        None if the database cannot be used.
+        """
+        state = self._state
+        if state.pid != os.getpid():
+            # sqlite connections must not be used in forked processes.
+            state.connection = None
+            state.database_path = None
+            state.touched = []
+            state.pid = os.getpid()
+
+        database_path = self._get_path('cache.db')
+        if state.database_path != database_path:
+            self._close()
+            if sqlite3 is None:
+                debug.warning('sqlite3 is not available, no file system cache.')
+                state.database_path = database_path
             else:
-                # 0 means version is not defined (= always delete cache):
-                if data.get('version', 0) != self.version:
-                    self.clear_cache()
-                    self.__index = {}
-                else:
-                    self.__index = data['index']
-        return self.__index
-
-    def _remove_old_modules(self):
-        # TODO use
-        change = False
-        if change:
-            self._flush_index(self)
-            self._index  # reload index
-
-    def _flush_index(self):
-        data = {'version': self.version, 'index': self._index}
-        with open(self._get_path('index.json'), 'w') as f:
-            json.dump(data, f)
-        self.__index = None
+                state.connection = self._connect(database_path)
+                if state.connection is not None:
+                    state.database_path = database_path
+        return state.connection
+
+    def _connect(self, database_path):
+        try:
+            return self._create_connection(database_path)
+        except sqlite3.OperationalError as e:
+            # Probably locked, just try again next time.
+            debug.warning('Cannot open the file system cache: %s', e)
+        except sqlite3.DatabaseError as e:
+            debug.warning('Broken file system cache, recreating it: %s', e)
+            try:
+                os.remove(database_path)
+                return self._create_connection(database_path)
+            except (OSError, sqlite3.DatabaseError) as e:
+                debug.warning('Cannot recreate the file system cache: %s', e)
+        return None
+
+    def _create_connection(self, database_path):
+        connection = sqlite3.connect(database_path, timeout=self.lock_timeout)
+        connection.text_factory = str
+        # Take the write lock at the start of transactions, otherwise two
+        # processes that both read first would deadlock.
+        connection.isolation_level = 'IMMEDIATE'
+        try:
+            # Readers don't block the writer and the other way around.
+            connection.execute('PRAGMA journal_mode=WAL')
+        except sqlite3.DatabaseError:
+            # e.g. on network file systems, the default journal works, too.
+            pass
+        with connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS meta '
+                               '(key TEXT PRIMARY KEY, value)')
+            row = connection.execute('SELECT value FROM meta WHERE key = ?',
+                                     ('version',)).fetchone()
+            if row is not None and row[0] != self.version:
+                connection.execute('DROP TABLE IF EXISTS parsers')
+                connection.execute('DROP TABLE IF EXISTS names')
+            connection.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                               ('version', self.version))
+            connection.execute('CREATE TABLE IF NOT EXISTS parsers ('
+                               'path TEXT PRIMARY KEY, change_time REAL, '
+                               'content_hash TEXT, last_used REAL, '
+                               'size INTEGER, checksum TEXT, format TEXT, '
+                               'data BLOB)')
+            connection.execute('CREATE INDEX IF NOT EXISTS content_hash_index '
+                               'ON parsers (content_hash)')
+            connection.execute('CREATE TABLE IF NOT EXISTS names ('
+                               'name TEXT, path TEXT, positions BLOB, '
+                               'PRIMARY KEY (name, path)) WITHOUT ROWID')
+            connection.execute('CREATE INDEX IF NOT EXISTS names_path_index '
+                               'ON names (path)')
+        return connection
+
+    def _close(self):
+        state = self._state
+        if state.connection is not None:
+            state.connection.close()
+        state.connection = None
+        state.database_path = None
+        state.touched = []
 
     def clear_cache(self):
+        self._close()
         shutil.rmtree(self._cache_directory())
 
-    def _get_hashed_path(self, path):
-        return self._get_path('%s.pkl' % hashlib.md5(path.encode("utf-8")).hexdigest())
-
     def _get_path(self, file):
         dir = self._cache_directory()
         if not os.path.exists(dir):
@@ -1,4 +1,5 @@
 """ A universal module with functions / classes without dependencies. """
+import os
 import sys
 import contextlib
 import functools
@@ -6,7 +7,6 @@ import re
 from ast import literal_eval
 
 from jedi._compatibility import unicode, reraise
-from jedi import settings
 
 
 class UncaughtAttributeError(Exception):
@@ -81,16 +81,18 @@ class PushBackIterator(object):
 
 
 @contextlib.contextmanager
-def scale_speed_settings(factor):
-    a = settings.max_executions
-    b = settings.max_until_execution_unique
-    settings.max_executions *= factor
-    settings.max_until_execution_unique *= factor
+def scale_speed_settings(evaluator, factor):
+    """
+    Scales `max_executions`, `max_until_execution_unique` and `time_budget`
+    for `evaluator`. The settings themselves are shared by all threads and are
+    not changed.
+    """
+    old = evaluator.speed_factor
+    evaluator.speed_factor = old * factor
     try:
         yield
     finally:
-        settings.max_executions = a
-        settings.max_until_execution_unique = b
+        evaluator.speed_factor = old
 
 
 def indent_block(text, indention='    '):
@@ -152,3 +154,25 @@ def splitlines(string):
     Also different: Returns ``['']`` for an empty string input.
     """
     return re.split('\n|\r\n', string)
+
+
+def find_files(paths, suffixes=('.py',)):
+    """
+    Returns the files below `paths` (directories or files) that end with one
+    of `suffixes`, every file only once.
+    """
+    files = []
+    seen = set()
+    for path in paths:
+        if os.path.isfile(path):
+            walked = [(os.path.dirname(path), [], [os.path.basename(path)])]
+        else:
+            walked = os.walk(path)
+        for root, dirnames, filenames in walked:
+            for filename in filenames:
+                if filename.endswith(tuple(suffixes)):
+                    file = os.path.join(root, filename)
+                    if file not in seen:
+                        seen.add(file)
+                        files.append(file)
+    return files
@@ -61,15 +61,17 @@ that are not used are just being ignored.
 """
 
 import copy
+import time
 from itertools import chain
 
 from jedi.parser import tree as pr
 from jedi import debug
+from jedi import settings
 from jedi.evaluate import representation as er
 from jedi.evaluate import imports
 from jedi.evaluate import recursion
 from jedi.evaluate import iterable
-from jedi.evaluate.cache import memoize_default
+from jedi.evaluate.cache import memoize_default, invalidate_module_results
 from jedi.evaluate import stdlib
 from jedi.evaluate import finder
 from jedi.evaluate import compiled
@@ -82,12 +84,98 @@ class Evaluator(object):
     def __init__(self, grammar):
         self.grammar = grammar
         self.memoize_cache = {}  # for memoize decorators
+        self.memoize_dependents = {}  # see `invalidate_module()`
+        self.memoize_stack = []
+        self.memoize_by_module = {}  # module -> memoized calls with its args
+        self.memoize_modules = {}  # memoized call -> modules of its args
+        self.memoize_unindexed = []  # memoized calls not in the index yet
         self.import_cache = {}  # like `sys.modules`.
         self.compiled_cache = {}  # see `compiled.create()`
-        self.recursion_detector = recursion.RecursionDetector()
-        self.execution_recursion_detector = recursion.ExecutionRecursionDetector()
+        # Set by `jedi.api.worker` to stop inference early.
+        self.cancel_event = None
+        self.deadline = None
+        # Instead of changing the settings, which are shared by all threads.
+        self.search_other_modules = True  # see `iterable._check_array_additions`
+        self.speed_factor = 1  # see `common.scale_speed_settings`
+        self.flow_information = True  # see `finder.check_flow_information`
+        self.evicted_modules = []  # see `cache.watch_evictions`
+        # (path, modification time) of the files that have been given to the
+        # processes of `imports._parse_in_parallel`. The ones without the
+        # searched name are not cached and would be outdated again in the
+        # next search.
+        self.checked_files = set()
+        self.reset_recursion_limitations()
         self.analysis = []
 
+    def reset_recursion_limitations(self):
+        """
+        The recursion limits are counted per evaluator. An evaluator that lives
+        longer than one API call (see :class:`jedi.api.Project`) has to reset
+        them before every call, otherwise it would stop evaluating after a few
+        requests.
+        """
+        self.recursion_detector = recursion.RecursionDetector()
+        self.execution_recursion_detector = \
+            recursion.ExecutionRecursionDetector(self)
+        self.stopped = False
+        self.start_time_budget()
+
+    def start_time_budget(self):
+        """
+        Starts to count :data:`jedi.settings.time_budget` anew. The API does
+        this whenever a method of :class:`jedi.api.Script` is called.
+        """
+        self.over_budget = False
+        self.start_time = time.time()
+
+    def is_stopped(self):
+        """
+        True if the `cancel_event` is set or the `deadline` (a ``time.time()``
+        value) has passed. Inference then stops at the next recursion check and
+        returns what it has found so far. Those partial results are not
+        memoized.
+        """
+        if not self.stopped:
+            if self.cancel_event is not None and self.cancel_event.is_set() \
+                    or self.deadline is not None and time.time() > self.deadline:
+                debug.warning('Inference stopped, returning partial results.')
+                self.stopped = True
+        return self.stopped
+
+    def is_over_budget(self):
+        """
+        True if :data:`jedi.settings.time_budget` is set and has been used up
+        since the last :meth:`start_time_budget`. Functions are then
+        not executed anymore and dynamic params are not searched. Like
+        partial results of :meth:`is_stopped`, these results are not memoized.
+        """
+        if not self.over_budget and settings.time_budget is not None:
+            budget = settings.time_budget * self.speed_factor
+            if (time.time() - self.start_time) * 1000 >= budget:
+                debug.warning('Time budget of %sms used up.', budget)
+                self.over_budget = True
+        return self.over_budget
+
+    def invalidate_module(self, module):
+        """
+        Drops the inference results that depend on `module`, because the
+        module has changed. All the other results stay cached.
+        """
+        count = invalidate_module_results(self, module)
+        debug.dbg('invalidated %s memoized results of %s', count, module)
+        for import_path, importer in list(self.import_cache.items()):
+            if importer.module is module:
+                del self.import_cache[import_path]
+
+    def forget_evicted_modules(self):
+        """
+        Invalidates the modules that have been evicted from the memory cache
+        (see :func:`jedi.cache.watch_evictions`), so that nothing keeps them
+        alive.
+        """
+        while self.evicted_modules:
+            self.invalidate_module(self.evicted_modules.pop())
+
     def find_types(self, scope, name_str, position=None, search_global=False,
                    is_goto=False):
         """
@@ -2,6 +2,11 @@
 - the popular ``memoize_default`` works like a typical memoize and returns the
   default otherwise.
 - ``CachedMetaClass`` uses ``memoize_default`` to do the same with classes.
+- ``invalidate_module_results`` removes all the memoized results that were
+  derived from a module. The results are indexed by the modules of their
+  arguments and while a memoized function is running, all the other memoized
+  results it uses are recorded as its dependencies. This way an evaluator can
+  stay alive even if a module changes.
 """
 
 import inspect
@@ -20,11 +25,12 @@ def memoize_default(default=NO_DEFAULT, evaluator_is_first_arg=False, second_arg
     def func(function):
         def wrapper(obj, *args, **kwargs):
             if evaluator_is_first_arg:
-                cache = obj.memoize_cache
+                evaluator = obj
             elif second_arg_is_evaluator:  # needed for meta classes
-                cache = args[0].memoize_cache
+                evaluator = args[0]
             else:
-                cache = obj._evaluator.memoize_cache
+                evaluator = obj._evaluator
+            cache = evaluator.memoize_cache
 
             try:
                 memo = cache[function]
@@ -33,20 +39,103 @@ def memoize_default(default=NO_DEFAULT, evaluator_is_first_arg=False, second_arg
                 cache[function] = memo
 
             key = (obj, args, frozenset(kwargs.items()))
+            entry = function, key
+            stack = evaluator.memoize_stack
+            if stack:
+                # The currently running function depends on this result.
+                try:
+                    evaluator.memoize_dependents[entry].add(stack[-1])
+                except KeyError:
+                    evaluator.memoize_dependents[entry] = set([stack[-1]])
+
             if key in memo:
                 return memo[key]
             else:
+                # Indexed later, finding the modules can call memoized
+                # functions as well.
+                evaluator.memoize_unindexed.append(entry)
                 if default is not NO_DEFAULT:
                     memo[key] = default
-                rv = function(obj, *args, **kwargs)
-                if inspect.isgenerator(rv):
-                    rv = list(rv)
-                memo[key] = rv
+                stack.append(entry)
+                try:
+                    rv = function(obj, *args, **kwargs)
+                    if inspect.isgenerator(rv):
+                        rv = list(rv)
+                finally:
+                    stack.pop()
+                if evaluator.stopped or evaluator.over_budget:
+                    # The result may be incomplete, don't keep it.
+                    memo.pop(key, None)
+                else:
+                    memo[key] = rv
                 return rv
         return wrapper
     return func
 
 
+def _modules_of(obj):
+    if inspect.isclass(obj):
+        return ()  # The key of a ``CachedMetaClass``.
+    try:
+        parent = obj.get_parent_until()
+    except AttributeError:
+        return ()
+    # Modules are usually wrapped by a ``representation.ModuleWrapper``.
+    base = getattr(parent, 'base', None)
+    return (parent,) if base is None else (parent, base)
+
+
+def _index_new_results(evaluator):
+    """Indexes the results that were memoized since the last call by module."""
+    pending = evaluator.memoize_unindexed
+    while pending:
+        entry = pending.pop()
+        function, key = entry
+        if entry in evaluator.memoize_modules \
+                or key not in evaluator.memoize_cache[function]:
+            continue  # Indexed already or not kept.
+        obj, args, kwargs = key
+        modules = set()
+        for arg in (obj,) + args:
+            modules.update(_modules_of(arg))
+        evaluator.memoize_modules[entry] = modules
+        for module in modules:
+            try:
+                evaluator.memoize_by_module[module].add(entry)
+            except KeyError:
+                evaluator.memoize_by_module[module] = set([entry])
+
+
+def invalidate_module_results(evaluator, module):
+    """
+    Removes the memoized results of all the calls that had an argument
+    within `module` and of all the calls that used such a result (directly or
+    indirectly).
+    """
+    _index_new_results(evaluator)
+    invalid = set(evaluator.memoize_by_module.pop(module, ()))
+    todo = list(invalid)
+    while todo:
+        dependents = evaluator.memoize_dependents.pop(todo.pop(), ())
+        for dependent in dependents:
+            if dependent not in invalid:
+                invalid.add(dependent)
+                todo.append(dependent)
+
+    for entry in invalid:
+        function, key = entry
+        evaluator.memoize_cache[function].pop(key, None)
+        evaluator.memoize_dependents.pop(entry, None)
+        # Other modules must not keep the removed entries alive.
+        for other in evaluator.memoize_modules.pop(entry, ()):
+            bucket = evaluator.memoize_by_module.get(other)
+            if bucket is not None:
+                bucket.discard(entry)
+                if not bucket:
+                    del evaluator.memoize_by_module[other]
+    return len(invalid)
+
+
 class CachedMetaClass(type):
     """
     This is basically almost the same than the decorator above, it just caches
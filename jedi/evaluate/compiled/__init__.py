@@ -9,11 +9,14 @@ from functools import partial
 
 from jedi._compatibility import builtins as _builtins, unicode
 from jedi import debug
+from jedi import settings
 from jedi.cache import underscore_memoization, memoize_method
 from jedi.evaluate.sys_path import get_sys_path
 from jedi.parser.tree import Param, Base, Operator, zero_position_modifier
 from jedi.evaluate.helpers import FakeName
 from . import fake
+from . import members
+from . import sandbox
 
 
 _sep = os.path.sep
@@ -41,6 +44,8 @@ class CompiledObject(Base):
     start_pos = 0, 0
     path = None  # modules have this attribute - set it to None.
     used_names = {}  # To be consistent with modules.
+    # ``(api_type, params, return, doc)`` from the member table of the parent.
+    _member = None
 
     def __init__(self, obj, parent=None):
         self.obj = obj
@@ -79,6 +84,8 @@ class CompiledObject(Base):
 
     @property
     def doc(self):
+        if self._member is not None:
+            return self._member[3]
         return inspect.getdoc(self.obj) or ''
 
     @property
@@ -98,12 +105,16 @@ class CompiledObject(Base):
 
     @underscore_memoization
     def _parse_function_doc(self):
+        if self._member is not None:
+            return self._member[1:3]
         if self.doc is None:
             return '', ''
 
         return _parse_function_doc(self.doc)
 
     def api_type(self):
+        if self._member is not None:
+            return self._member[0]
         if fake.is_class_instance(self.obj):
             return 'instance'
 
@@ -254,14 +265,20 @@ class LazyNamesDict(object):
 
     @memoize_method
     def __getitem__(self, name):
+        table = members.lookup(self._compiled_obj.obj)
         try:
-            getattr(self._compiled_obj.obj, name)
+            if table is None or name not in table:
+                # Tables can miss names that were added at runtime.
+                getattr(self._compiled_obj.obj, name)
         except AttributeError:
             raise KeyError('%s in %s not found.' % (name, self._compiled_obj))
         return [CompiledName(self._compiled_obj, name)]
 
     def values(self):
         obj = self._compiled_obj.obj
+        # With a table only the names that it misses have to be looked up,
+        # like ``sys.ps1``, which only exists in an interactive interpreter.
+        members.get(obj, _build_member_table)
 
         values = []
         for name in dir(obj):
@@ -277,6 +294,19 @@ class LazyNamesDict(object):
         return values
 
 
+def _build_member_table(obj):
+    """Introspects the members of `obj` for :mod:`.members`."""
+    table = {}
+    for name in dir(obj):
+        try:
+            member = CompiledObject(getattr(obj, name))
+        except AttributeError:
+            continue  # The dir function can be wrong.
+        table[name] = (member.api_type(),) + member._parse_function_doc() \
+            + (member.doc,)
+    return table
+
+
 class CompiledName(FakeName):
     def __init__(self, obj, name):
         super(CompiledName, self).__init__(name)
@@ -343,6 +373,10 @@ def load_module(path, name):
         p, _, dotted_path = path.partition(os.path.sep)
         sys_path.insert(0, p)
 
+    if path is not None and settings.introspection_workers \
+            and dotted_path not in sys.modules:
+        return sandbox.load_module(path, dotted_path, sys_path)
+
     temp, sys.path = sys.path, sys_path
     try:
         __import__(dotted_path)
@@ -459,7 +493,11 @@ def _create_from_name(module, parent, name):
         # PyQt4.QtGui.QStyleOptionComboBox.currentText
         # -> just set it to None
         obj = None
-    return CompiledObject(obj, parent)
+    compiled_obj = CompiledObject(obj, parent)
+    table = members.lookup(parent.obj)
+    if table is not None and name in table:
+        compiled_obj._member = table[name]
+    return compiled_obj
 
 
 builtin = Builtin(_builtins)
@@ -6,13 +6,18 @@ mixing in Python code, the autocompletion should work much better for builtins.
 
 import os
 import inspect
+import threading
 
 from jedi._compatibility import is_py3, builtins, unicode
+from jedi import cache
 from jedi.parser import Parser, load_grammar
 from jedi.parser import tree as pt
 from jedi.evaluate.helpers import FakeName
 
 modules = {}
+_lock = threading.Lock()
+# scope -> {name: subscope}, faked scopes never change after loading.
+_subscopes = {}
 
 
 def _load_faked_module(module):
@@ -20,18 +25,30 @@ def _load_faked_module(module):
     if module_name == '__builtin__' and not is_py3:
         module_name = 'builtins'
 
+    with _lock:
+        return _load_locked(module_name)
+
+
+def _load_locked(module_name):
     try:
         return modules[module_name]
     except KeyError:
         path = os.path.dirname(os.path.abspath(__file__))
+        path = os.path.join(path, 'fake', module_name) + '.pym'
+        # Like other modules, the faked modules are in the file system cache,
+        # so that not every process has to parse them.
         try:
-            with open(os.path.join(path, 'fake', module_name) + '.pym') as f:
-                source = f.read()
-        except IOError:
+            parser = cache.load_parser(path, None)
+        except OSError:
             modules[module_name] = None
             return
-        grammar = load_grammar('grammar3.4')
-        module = Parser(grammar, unicode(source), module_name).module
+        if parser is None:
+            with open(path) as f:
+                source = f.read()
+            grammar = load_grammar('grammar3.4')
+            parser = Parser(grammar, unicode(source), module_name)
+            cache.save_parser(path, None, parser)
+        module = parser.module
         modules[module_name] = module
 
         if module_name == 'builtins' and not is_py3:
@@ -41,13 +58,19 @@ def _load_faked_module(module):
             open_func.children[1] = FakeName('open_python3')
             open_func = search_scope(module, 'open_python2')
             open_func.children[1] = FakeName('open')
+            del _subscopes[module]
         return module
 
 
 def search_scope(scope, obj_name):
-    for s in scope.subscopes:
-        if str(s.name) == obj_name:
-            return s
+    try:
+        subscopes = _subscopes[scope]
+    except KeyError:
+        subscopes = {}
+        for s in scope.subscopes:
+            subscopes.setdefault(str(s.name), s)
+        _subscopes[scope] = subscopes
+    return subscopes.get(obj_name)
 
 
 def get_module(obj):
@@ -109,7 +132,7 @@ def get_faked(module, obj, name=None):
         doc = '"""%s"""' % obj.__doc__  # TODO need escapes.
         suite = result.children[-1]
         string = pt.String(pt.zero_position_modifier, doc, (0, 0), '')
-        new_line = pt.Whitespace('\n', (0, 0), '')
+        new_line = pt.Whitespace(pt.zero_position_modifier, '\n', (0, 0), '')
         docstr_node = pt.Node('simple_stmt', [string, new_line])
         suite.children.insert(2, docstr_node)
         return result
@@ -0,0 +1,235 @@
+"""
+Tables of the members of compiled modules and classes. Calling ``dir()`` and
+``getattr()`` on every member of ``numpy`` or ``os`` is slow and every
+evaluator creates its own :class:`jedi.evaluate.compiled.CompiledObject`
+objects. Therefore the tables are shared by the whole process and stored in
+the cache directory, so other processes don't introspect the same modules
+again.
+
+A table maps the names of the members of an object to ``(api_type, params,
+return, doc)``, params and return as returned by ``_parse_function_doc``. The
+tables of a module are keyed by its name and version, which is its
+``__version__`` and the modification time of its file (or the Python version
+for builtin modules). New tables are written by :func:`save`, at the end of
+a completion and at exit.
+
+A table can miss names, e.g. ``sys.ps1`` only exists in an interactive
+interpreter, so a missing name is looked up on the object as well.
+"""
+import atexit
+import hashlib
+import inspect
+import os
+import sys
+import threading
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from jedi import settings
+from jedi import debug
+from jedi import cache
+
+_cache_version = 2
+
+# (module name, version) -> {qualified name: table}
+_tables = {}
+_versions = {}
+# id(obj) -> (obj, result of `_find`), the object keeps the id valid.
+_found = {}
+# (module name, version) -> module, of the tables that are not saved yet.
+_unsaved = {}
+_lock = threading.RLock()
+
+
+def _module_version(module):
+    name = module.__name__
+    with _lock:
+        try:
+            return _versions[name]
+        except KeyError:
+            pass
+
+    if name in sys.builtin_module_names:
+        version = sys.version
+    else:
+        try:
+            version = '%s-%s' % (getattr(module, '__version__', None),
+                                 os.path.getmtime(module.__file__))
+        except (AttributeError, TypeError, OSError):
+            # Modules without a file, e.g. ``__main__`` in an interpreter,
+            # can change at any time.
+            version = None
+    with _lock:
+        return _versions.setdefault(name, version)
+
+
+def _find(obj):
+    """
+    Returns the module and the qualified name of a module or class, if the
+    class can be found in its module by this name. None otherwise.
+    """
+    with _lock:
+        try:
+            return _found[id(obj)][1]
+        except KeyError:
+            pass
+
+    if inspect.ismodule(obj) or inspect.isclass(obj):
+        result = _find_uncached(obj)
+        with _lock:
+            _found[id(obj)] = obj, result
+        return result
+    return None
+
+
+def _find_uncached(obj):
+    if inspect.ismodule(obj):
+        module, qualname = obj, ''
+    else:
+        try:
+            module = sys.modules.get(obj.__module__)
+        except TypeError:
+            return None  # __module__ is not always a string.
+        qualname = getattr(obj, '__qualname__', obj.__name__)
+        found = module
+        try:
+            for part in qualname.split('.'):
+                found = getattr(found, part)
+        except AttributeError:
+            return None
+        if found is not obj:
+            return None
+
+    if module is None or _module_version(module) is None:
+        return None
+    return module, qualname
+
+
+def _module_tables(module):
+    key = module.__name__, _module_version(module)
+    with _lock:
+        try:
+            return _tables[key]
+        except KeyError:
+            pass
+
+    tables = {}
+    if settings.use_filesystem_cache:
+        try:
+            with open(_cache_path(module), 'rb') as f:
+                tables = pickle.load(f)
+        except (IOError, OSError):
+            pass  # Not stored yet.
+        except Exception as e:
+            # Pickle raises all kinds of exceptions for broken files.
+            debug.warning('Cannot load the members of %s: %s', module, e)
+    with _lock:
+        return _tables.setdefault(key, tables)
+
+
+def _cache_path(module):
+    version = hashlib.sha1(_module_version(module).encode('utf-8'))
+    name = '%s-%s-%s.pickle' % (module.__name__, _cache_version,
+                                version.hexdigest()[:16])
+    return os.path.join(settings.cache_directory, cache.ParserPickling.py_tag,
+                        'compiled', name)
+
+
+def _save(module, tables):
+    with _lock:
+        tables = dict(tables)  # Other threads may add tables meanwhile.
+    path = _cache_path(module)
+    try:
+        directory = os.path.dirname(path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        # Other processes must never load a partly written file.
+        temp_path = '%s.%s.tmp' % (path, os.getpid())
+        with open(temp_path, 'wb') as f:
+            pickle.dump(tables, f, pickle.HIGHEST_PROTOCOL)
+        getattr(os, 'replace', os.rename)(temp_path, path)
+    except (IOError, OSError) as e:
+        debug.warning('Cannot store the members of %s: %s', module, e)
+
+
+def lookup(obj):
+    """
+    Returns the table of `obj` if it has been built before, otherwise None.
+    """
+    found = _find(obj)
+    if found is None:
+        return None
+    module, qualname = found
+    tables = _module_tables(module)
+    with _lock:
+        return tables.get(qualname)
+
+
+def get(obj, build):
+    """
+    Returns the table of `obj` and calls ``build(obj)`` to create it if it
+    doesn't exist yet. Returns None if `obj` cannot have a table, because it
+    cannot be found again by its name.
+    """
+    found = _find(obj)
+    if found is None:
+        return None
+    module, qualname = found
+    tables = _module_tables(module)
+    with _lock:
+        try:
+            return tables[qualname]
+        except KeyError:
+            pass
+    table = build(obj)
+    with _lock:
+        table = tables.setdefault(qualname, table)
+        _unsaved[module.__name__, _module_version(module)] = module
+    return table
+
+
+@atexit.register
+def save():
+    """Writes the tables that have been built since the last call."""
+    with _lock:
+        modules = list(_unsaved.values())
+        _unsaved.clear()
+    if settings.use_filesystem_cache:
+        for module in modules:
+            _save(module, _module_tables(module))
+
+
+def build_all(module, build):
+    """
+    Builds the tables of `module` and of all classes that are defined in it
+    and stores them at once. Returns the number of tables.
+    """
+    if _find(module) is None:
+        return 0
+    tables = _module_tables(module)
+    qualnames = set()
+    objects = [module]
+    while objects:
+        obj = objects.pop()
+        found = _find(obj)
+        if found is None or found[0] is not module or found[1] in qualnames:
+            continue
+        qualname = found[1]
+        qualnames.add(qualname)
+        with _lock:
+            table = tables.get(qualname)
+        if table is None:
+            table = build(obj)
+            with _lock:
+                table = tables.setdefault(qualname, table)
+        for name, member in table.items():
+            if member[0] == 'class':
+                try:
+                    objects.append(getattr(obj, name))
+                except Exception:
+                    pass  # Modules can do anything in __getattr__.
+    if settings.use_filesystem_cache:
+        _save(module, tables)
+    return len(qualnames)
@@ -0,0 +1,239 @@
+"""
+Introspects compiled modules in other processes. :func:`jedi.evaluate.compiled.
+load_module` imports C extensions like PyQt or numpy into the process that
+uses |jedi| (typically an editor), which costs memory and can crash or hang
+it. If :data:`jedi.settings.introspection_workers` is set, a pool of processes
+imports them instead and returns Python stubs that are generated from the
+member tables of :mod:`jedi.evaluate.compiled.members`::
+
+    class QWidget(QObject, QPaintDevice):
+        'The QWidget class is the base class of all user interface objects.'
+        def close(self):
+            return bool()
+
+The stubs are parsed like any other module and therefore end up in the parser
+cache, also on disk, but under their own key, so they are only used while the
+sandbox is on. The processes are reused for later requests and keep
+their modules imported, so every module is only imported once.
+"""
+import inspect
+import keyword
+import multiprocessing
+import re
+import sys
+import threading
+
+from jedi._compatibility import builtins, unicode
+from jedi import cache
+from jedi import debug
+from jedi import settings
+from jedi.parser import load_grammar
+from jedi.parser import parallel
+from jedi.parser.fast import FastParser
+from jedi.evaluate.compiled import members
+
+# Seconds after which an import is considered to hang.
+_timeout = 10.0
+
+_pool = None
+_lock = threading.Lock()
+
+
+def _introspect(dotted_path, sys_path):
+    """Runs in a worker and returns the stub of a module or None."""
+    sys.path = sys_path
+    try:
+        __import__(dotted_path)
+        return _Stub(sys.modules[dotted_path]).source()
+    except Exception as e:
+        debug.warning('Module %s not importable: %s', dotted_path, e)
+        return None
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = parallel.create_pool(settings.introspection_workers)
+        return _pool
+
+
+def shutdown():
+    """Terminates the processes. They are started again when needed."""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+
+
+def _stub_key(path):
+    # Not `path` itself, the stubs are only used while the sandbox is on.
+    return 'stub:' + path
+
+
+def load_module(path, dotted_path, sys_path):
+    """
+    Returns the stub module of the compiled module at `path` or None if it
+    cannot be imported.
+    """
+    parser = cache.load_parser(path, None, key=_stub_key(path))
+    if parser is not None:
+        return parser.module
+
+    result = _get_pool().apply_async(_introspect, (dotted_path, sys_path))
+    try:
+        source = result.get(_timeout)
+    except multiprocessing.TimeoutError:
+        # The worker hangs or has crashed, the pool would wait forever.
+        debug.warning('Importing %s timed out.', path)
+        shutdown()
+        return None
+    if source is None:
+        return None
+
+    grammar = load_grammar('grammar%s.%s' % sys.version_info[:2])
+    parser = FastParser(grammar, unicode(source), path)
+    cache.save_parser(path, None, parser, key=_stub_key(path))
+    return parser.module
+
+
+def _is_identifier(name):
+    return re.match(r'^[A-Za-z_]\w*$', name) is not None \
+        and not keyword.iskeyword(name)
+
+
+class _Stub(object):
+    """Writes the Python source of a stub for `module`."""
+    def __init__(self, module):
+        self._module = module
+        self._lines = []
+
+    def source(self):
+        from jedi.evaluate import compiled
+        # Stores all tables at once instead of once per class.
+        members.build_all(self._module, compiled._build_member_table)
+        self._add_doc(self._module, '')
+        self._add_scope(self._module, '', '')
+        return '\n'.join(self._lines) + '\n'
+
+    def _table(self, obj):
+        from jedi.evaluate import compiled
+        table = members.get(obj, compiled._build_member_table)
+        return compiled._build_member_table(obj) if table is None else table
+
+    def _reference(self, cls):
+        """Returns the name of `cls` within the stub or None."""
+        module = getattr(cls, '__module__', None)
+        qualname = getattr(cls, '__qualname__', cls.__name__)
+        if getattr(builtins, cls.__name__, None) is cls:
+            return cls.__name__
+        elif module == self._module.__name__ and self._is_own(cls, qualname):
+            return qualname
+        return None
+
+    def _is_own(self, cls, qualname):
+        """Whether `cls` is defined in the module with this qualified name."""
+        found = self._module
+        try:
+            for part in qualname.split('.'):
+                found = getattr(found, part)
+        except AttributeError:
+            return False
+        return found is cls
+
+    def _add_doc(self, obj, indent):
+        doc = inspect.getdoc(obj)
+        if doc:
+            self._lines.append(indent + repr(doc))
+
+    def _add_scope(self, obj, prefix, indent):
+        # Classes first and bases before subclasses, because names are only
+        # found after their definition.
+        classes, functions, others = [], [], []
+        is_class = inspect.isclass(obj)
+        for name, member in sorted(self._table(obj).items()):
+            if not _is_identifier(name) or is_class and name not in vars(obj):
+                continue
+            try:
+                value = getattr(obj, name)
+            except Exception:
+                continue
+            if inspect.isclass(value):
+                qualname = getattr(value, '__qualname__', name)
+                if qualname == prefix + name and self._is_own(value, qualname):
+                    classes.append((len(inspect.getmro(value)), name, value))
+                    continue
+            elif callable(value):
+                functions.append((name, value, member))
+                continue
+            if not name.startswith('__'):
+                others.append((name, value))
+
+        for _, name, value in sorted(classes):
+            self._add_class(name, value, prefix, indent)
+        for name, value, member in functions:
+            self._add_function(obj, name, value, member, indent)
+        for name, value in others:
+            self._add_value(name, value, indent)
+
+    def _add_class(self, name, cls, prefix, indent):
+        bases = [self._reference(b) for b in cls.__bases__]
+        self._lines.append('%sclass %s(%s):' % (
+            indent, name, ', '.join(b for b in bases if b is not None)))
+        length = len(self._lines)
+        self._add_doc(cls, indent + '    ')
+        self._add_scope(cls, prefix + name + '.', indent + '    ')
+        if len(self._lines) == length:
+            self._lines.append(indent + '    pass')
+
+    def _add_function(self, scope, name, func, member, indent):
+        _, params, ret, _ = member
+        params = [p.strip() for p in params.split(',')]
+        params = [p for p in params if p and p != '/']
+        if inspect.isclass(scope):
+            raw = vars(scope)[name]
+            if isinstance(raw, staticmethod) \
+                    or type(raw).__name__ == 'staticmethod':
+                self._lines.append(indent + '@staticmethod')
+            else:
+                first = 'self'
+                if isinstance(raw, classmethod) \
+                        or type(raw).__name__ == 'classmethod_descriptor':
+                    self._lines.append(indent + '@classmethod')
+                    first = 'cls'
+                if params[:1] != [first]:
+                    params.insert(0, first)
+
+        params = ', '.join(params)
+        try:
+            compile('def f(%s): pass' % params, '<stub>', 'exec')
+        except SyntaxError:
+            params = '*args, **kwargs'
+        self._lines.append('%sdef %s(%s):' % (indent, name, params))
+        self._add_doc(func, indent + '    ')
+        self._lines.append('%s    %s' % (indent, self._return(ret)))
+
+    def _return(self, ret):
+        # Like `CompiledObject._execute_function`, which uses the builtin
+        # classes that are mentioned in the docstring.
+        for name in ret.split():
+            if inspect.isclass(getattr(builtins, name, None)):
+                return 'return %s()' % name
+        return 'pass'
+
+    def _add_value(self, name, value, indent):
+        if inspect.ismodule(value):
+            if indent:
+                return
+            line = 'import %s as %s' % (value.__name__, name)
+        elif value is None or type(value) in (bool, int, float, complex,
+                                              str, bytes, unicode) \
+                and len(repr(value)) < 100:
+            line = '%s = %r' % (name, value)
+        else:
+            # Descriptors for example are not available by their name.
+            cls = self._reference(type(value)) or 'object'
+            line = '%s = %s()' % (name, cls)
+        self._lines.append(indent + line)
@@ -51,7 +51,7 @@ def search_params(evaluator, param):
     have to look for all calls to ``func`` to find out what ``foo`` possibly
     is.
     """
-    if not settings.dynamic_params:
+    if not settings.dynamic_params or evaluator.is_over_budget():
         return []
     debug.dbg('Dynamic param search for %s', param)
 
@@ -384,7 +384,8 @@ def check_flow_information(evaluator, flow, search_name, pos):
 
     ensures that `k` is a string.
     """
-    if not settings.dynamic_flow_information:
+    if not settings.dynamic_flow_information \
+            or not evaluator.flow_information:
         return None
 
     result = []
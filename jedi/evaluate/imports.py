@@ -15,6 +15,7 @@ import imp
 import os
 import pkgutil
 import sys
+import threading
 from itertools import chain
 
 from jedi._compatibility import find_module, unicode
@@ -22,6 +23,7 @@ from jedi import common
 from jedi import debug
 from jedi import cache
 from jedi.parser import fast
+from jedi.parser import parallel
 from jedi.parser import tree as pr
 from jedi.evaluate.sys_path import get_sys_path, sys_path_with_modifications
 from jedi.evaluate import helpers
@@ -507,6 +509,51 @@ def _load_module(evaluator, path=None, source=None, name=None, sys_path=None):
     return load(source) if cached is None else cached.module
 
 
+# The pool of `_parse_in_parallel` and its settings, started on first use.
+_pool = None
+_pool_settings = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    global _pool, _pool_settings
+    current = workers, settings.cache_directory, \
+        settings.use_filesystem_cache, settings.filesystem_cache_by_content
+    if _pool_settings != current:
+        if _pool is not None:
+            _pool.terminate()
+        _pool = parallel.create_pool(workers)
+        _pool_settings = current
+    return _pool
+
+
+def _parse_in_parallel(evaluator, paths, name):
+    """
+    Parses the files that contain `name` into the file system cache, from
+    which they are then loaded like any other cached module.
+    """
+    with _pool_lock:
+        unchecked = []
+        for path in parallel.outdated(sorted(paths)):
+            try:
+                key = path, os.path.getmtime(path)
+            except OSError:
+                continue
+            if key not in evaluator.checked_files:
+                unchecked.append(path)
+                evaluator.checked_files.add(key)
+        paths = unchecked
+        workers = settings.dynamic_search_workers
+        if len(paths) < 2 * workers:
+            # Using the processes would cost more than it saves. The files
+            # are checked in this process anyway.
+            return
+        debug.dbg('Parsing %s modules for %s in parallel', len(paths), name)
+        chunk_size = -(-len(paths) // workers)
+        parallel.parse_files(paths, workers, min(chunk_size, 20), name,
+                             _get_pool(workers))
+
+
 def get_modules_containing_name(evaluator, mods, name):
     """
     Search a name in the directories of modules.
@@ -517,10 +564,15 @@ def get_modules_containing_name(evaluator, mods, name):
         except KeyError:
             try:
                 return check_fs(path)
-            except IOError:
+            except (IOError, OSError):
                 return None
 
     def check_fs(path):
+        if path in change_times and os.path.getmtime(path) <= change_times[path]:
+            # The module is cached and so are its names, no need to read it.
+            if path in indexed:
+                return _load_module(evaluator, path)
+            return None
         with open(path, 'rb') as f:
             source = source_to_unicode(f.read())
             if name in source:
@@ -533,7 +585,8 @@ def get_modules_containing_name(evaluator, mods, name):
         mod_paths.add(m.path)
         yield m
 
-    if settings.dynamic_params_for_other_modules:
+    if settings.dynamic_params_for_other_modules \
+            and evaluator.search_other_modules:
         paths = set(settings.additional_dynamic_modules)
         for p in mod_paths:
             if p is not None:
@@ -543,6 +596,15 @@ def get_modules_containing_name(evaluator, mods, name):
                         if entry.endswith('.py'):
                             paths.add(d + os.path.sep + entry)
 
+        change_times = {}
+        indexed = {}
+        if settings.use_filesystem_cache:
+            uncached = [p for p in paths if p not in cache.parser_cache]
+            if settings.dynamic_search_workers > 1:
+                _parse_in_parallel(evaluator, uncached, name)
+            change_times = cache.ParserPickling.change_times(uncached)
+            indexed = cache.ParserPickling.find_name(name, uncached)
+
         for p in sorted(paths):
             # make testing easier, sort it - same results on every interpreter
             c = check_python_file(p)
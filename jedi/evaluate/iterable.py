@@ -476,8 +476,8 @@ def _check_array_additions(evaluator, compare_array, module, is_list):
             return node
         return node.get_parent_until(er.FunctionExecution)
 
-    temp_param_add, settings.dynamic_params_for_other_modules = \
-        settings.dynamic_params_for_other_modules, False
+    temp_param_add, evaluator.search_other_modules = \
+        evaluator.search_other_modules, False
 
     search_names = ['append', 'extend', 'insert'] if is_list else ['add', 'update']
     comp_arr_parent = get_execution_parent(compare_array)
@@ -530,8 +530,8 @@ def _check_array_additions(evaluator, compare_array, module, is_list):
                     added_types += check_additions(execution_trailer.children[1], add_name)
 
                 evaluator.recursion_detector.pop_stmt()
-    # reset settings
-    settings.dynamic_params_for_other_modules = temp_param_add
+    # reset
+    evaluator.search_other_modules = temp_param_add
     return added_types
 
 
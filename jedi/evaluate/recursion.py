@@ -3,9 +3,9 @@ Recursions are the recipe of |jedi| to conquer Python code. However, someone
 must stop recursions going mad. Some settings are here to make |jedi| stop at
 the right time. You can read more about them :ref:`here <settings-recursion>`.
 
-Next to :mod:`jedi.evaluate.cache` this module also makes |jedi| not
-thread-safe. Why?  ``execution_recursion_decorator`` uses class variables to
-count the function calls.
+The detectors belong to an :class:`jedi.evaluate.Evaluator`, like the caches
+of :mod:`jedi.evaluate.cache`. An evaluator must therefore only be used by one
+thread at a time.
 """
 from jedi.parser import tree as pr
 from jedi import debug
@@ -18,7 +18,10 @@ def recursion_decorator(func):
     def run(evaluator, stmt, *args, **kwargs):
         rec_detect = evaluator.recursion_detector
         # print stmt, len(self.node_statements())
-        if rec_detect.push_stmt(stmt):
+        # Checking the budget here finds out early that it's used up, even
+        # if no function is executed.
+        evaluator.is_over_budget()
+        if evaluator.is_stopped() or rec_detect.push_stmt(stmt):
             return []
         else:
             result = func(evaluator, stmt, *args, **kwargs)
@@ -95,6 +98,8 @@ class _RecursionNode(object):
 
 def execution_recursion_decorator(func):
     def run(execution, **kwargs):
+        if execution._evaluator.is_stopped():
+            return []
         detector = execution._evaluator.execution_recursion_detector
         if detector.push_execution(execution):
             result = []
@@ -111,7 +116,8 @@ class ExecutionRecursionDetector(object):
     Catches recursions of executions.
     It is designed like a Singelton. Only one instance should exist.
     """
-    def __init__(self):
+    def __init__(self, evaluator):
+        self._evaluator = evaluator
         self.recursion_level = 0
         self.parent_execution_funcs = []
         self.execution_funcs = set()
@@ -139,7 +145,12 @@ class ExecutionRecursionDetector(object):
         cls.execution_funcs.add(execution.base)
         cls.parent_execution_funcs.append(execution.base)
 
-        if cls.execution_count > settings.max_executions:
+        factor = cls._evaluator.speed_factor
+        if settings.time_budget is not None:
+            # The budget replaces the execution counters.
+            if cls._evaluator.is_over_budget():
+                return True
+        elif cls.execution_count > settings.max_executions * factor:
             return True
 
         if isinstance(execution.base, (iterable.Array, iterable.Generator)):
@@ -151,9 +162,10 @@ class ExecutionRecursionDetector(object):
         if in_par_execution_funcs:
             if cls.recursion_level > settings.max_function_recursion_level:
                 return True
-        if in_execution_funcs and \
-                len(cls.execution_funcs) > settings.max_until_execution_unique:
+        max_unique = settings.max_until_execution_unique * factor
+        if in_execution_funcs and len(cls.execution_funcs) > max_unique:
             return True
-        if cls.execution_count > settings.max_executions_without_builtins:
+        if settings.time_budget is None \
+                and cls.execution_count > settings.max_executions_without_builtins:
             return True
         return False
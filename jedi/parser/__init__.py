@@ -17,14 +17,21 @@ complexity of the ``Parser`` (there's another parser sitting inside
 """
 import os
 import re
+import hashlib
 
+from jedi._compatibility import intern
+from jedi import settings
+from jedi import debug
+from jedi import cache
 from jedi.parser import tree as pt
 from jedi.parser import tokenize
 from jedi.parser import token
 from jedi.parser.token import (DEDENT, INDENT, ENDMARKER, NEWLINE, NUMBER,
                                STRING, OP, ERRORTOKEN)
 from jedi.parser.pgen2.pgen import generate_grammar
-from jedi.parser.pgen2.parse import PgenParser
+from jedi.parser.pgen2.parse import (PgenParser, TablePgenParser,
+                                     transition_tables)
+from jedi.parser.pgen2.grammar import Grammar
 
 OPERATOR_KEYWORDS = 'and', 'for', 'if', 'else', 'in', 'is', 'lambda', 'not', 'or'
 # Not used yet. In the future I intend to add something like KeywordStatement
@@ -34,6 +41,12 @@ STATEMENT_KEYWORDS = 'assert', 'del', 'global', 'nonlocal', 'raise', \
 
 _loaded_grammars = {}
 
+_grammar_cache_version = 1
+"""
+Version of the grammar tables in the cache directory. Increment it when the
+tables that pgen generates change.
+"""
+
 
 def load_grammar(file='grammar3.4'):
     # For now we only support two different Python syntax versions: The latest
@@ -48,7 +61,45 @@ def load_grammar(file='grammar3.4'):
     try:
         return _loaded_grammars[path]
     except KeyError:
-        return _loaded_grammars.setdefault(path, generate_grammar(path))
+        return _loaded_grammars.setdefault(path, _load_grammar_tables(path))
+
+
+def _load_grammar_tables(path):
+    """
+    Returns the grammar of the grammar file `path`. Generating the tables with
+    pgen takes a while, therefore they are stored in the cache directory and
+    only generated again if the grammar file changes.
+    """
+    if not settings.use_filesystem_cache:
+        return generate_grammar(path)
+
+    with open(path, 'rb') as f:
+        content_hash = hashlib.sha1(f.read()).hexdigest()
+    name = '%s-%s-%s.pickle' % (os.path.splitext(os.path.basename(path))[0],
+                                _grammar_cache_version, content_hash[:16])
+    directory = os.path.join(settings.cache_directory,
+                             cache.ParserPickling.py_tag, 'grammars')
+    cache_path = os.path.join(directory, name)
+    grammar = Grammar()
+    try:
+        grammar.load(cache_path)
+        return grammar
+    except (IOError, OSError):
+        pass  # Not generated yet.
+    except Exception as e:
+        # Pickle raises all kinds of exceptions for broken files.
+        debug.warning('Cannot load grammar tables %s: %s', cache_path, e)
+
+    grammar = generate_grammar(path)
+    # Store the transition tables as well, they are computed anyway.
+    transition_tables(grammar)
+    try:
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        grammar.dump(cache_path)
+    except (IOError, OSError) as e:
+        debug.warning('Cannot store grammar tables %s: %s', cache_path, e)
+    return grammar
 
 
 class ErrorStatement(object):
@@ -149,8 +200,12 @@ class Parser(object):
 
         # For the fast parser.
         self.position_modifier = pt.PositionModifier()
-        p = PgenParser(grammar, self.convert_node, self.convert_leaf,
-                       self.error_recovery)
+        if settings.table_driven_parser:
+            pgen_parser = TablePgenParser
+        else:
+            pgen_parser = PgenParser
+        p = pgen_parser(grammar, self.convert_node, self.convert_leaf,
+                        self.error_recovery)
         tokenizer = tokenizer or tokenize.source_tokens(source)
         self.module = p.parse(self._tokenize(tokenizer))
         if self.module.type != 'file_input':
@@ -207,7 +262,11 @@ class Parser(object):
 
     def convert_leaf(self, grammar, type, value, prefix, start_pos):
         #print('leaf', value, pytree.type_repr(type))
+        # Names, operators and indentation repeat a lot. Sharing the strings
+        # saves a lot of memory in big modules.
+        prefix = intern(prefix)
         if type == tokenize.NAME:
+            value = intern(value)
             if value in grammar.keywords:
                 if value in ('def', 'class', 'lambda'):
                     self._scope_names_stack.append({})
@@ -226,9 +285,11 @@ class Parser(object):
         elif type == NUMBER:
             return pt.Number(self.position_modifier, value, start_pos, prefix)
         elif type in (NEWLINE, ENDMARKER):
-            return pt.Whitespace(self.position_modifier, value, start_pos, prefix)
+            return pt.Whitespace(self.position_modifier, intern(value),
+                                 start_pos, prefix)
         else:
-            return pt.Operator(self.position_modifier, value, start_pos, prefix)
+            return pt.Operator(self.position_modifier, intern(value),
+                               start_pos, prefix)
 
     def error_recovery(self, grammar, stack, typ, value, start_pos, prefix,
                        add_token_callback):
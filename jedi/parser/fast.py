@@ -4,6 +4,8 @@ anything changes, it only reparses the changed parts. But because it's not
 finished (and still not working as I want), I won't document it any further.
 """
 import re
+import threading
+import time
 from itertools import chain
 
 from jedi._compatibility import use_metaclass
@@ -95,18 +97,35 @@ class MergedNamesDict(object):
         return lst
 
 
+# Locks of the cached parsers by module path. A cached parser is updated in
+# place, two threads must not do that at the same time.
+_update_locks = {}
+
+
 class CachedFastParser(type):
     """ This is a metaclass for caching `FastParser`. """
-    def __call__(self, grammar, source, module_path=None):
+    def __call__(self, grammar, source, module_path=None, cached=True):
         if not settings.fast_parser:
             return Parser(grammar, source, module_path)
+        if not cached:
+            return super(CachedFastParser, self).__call__(grammar, source, module_path)
+
+        # Only the lookup holds the lock of the cache (`cache.save_parser`
+        # stores the result), other modules are parsed at the same time.
+        with cache._lock:
+            pi = cache.parser_cache.get(module_path, None)
+            if pi is None or isinstance(pi.parser, Parser):
+                pi = None
+            else:
+                update_lock = _update_locks.setdefault(module_path,
+                                                       threading.Lock())
+        if pi is None:
+            return super(CachedFastParser, self).__call__(grammar, source, module_path)
 
-        pi = cache.parser_cache.get(module_path, None)
-        if pi is None or isinstance(pi.parser, Parser):
-            p = super(CachedFastParser, self).__call__(grammar, source, module_path)
-        else:
-            p = pi.parser  # pi is a `cache.ParserCacheItem`
+        p = pi.parser  # pi is a `cache.ParserCacheItem`
+        with update_lock:
             p.update(source)
+        pi.last_used = time.time()
         return p
 
 
@@ -245,8 +264,14 @@ class FastParser(use_metaclass(CachedFastParser)):
     def _reset_caches(self):
         self.module = FastModule(self.module_path)
         self.current_node = ParserNode(self.module, self, '')
+        self._lines = []
+        self._parts = []
+        self._source = None
 
     def update(self, source):
+        self._update(source)
+
+    def _update(self, source, lines=None, changed=None):
         # For testing purposes: It is important that the number of parsers used
         # can be minimized. With these variables we can test against that.
         self.number_parsers_used = 0
@@ -254,17 +279,69 @@ class FastParser(use_metaclass(CachedFastParser)):
         self.number_of_misses = 0
         self.module.reset_caches()
         try:
-            self._parse(source)
+            self._parse(source, lines, changed)
         except:
             # FastParser is cached, be careful with exceptions.
             self._reset_caches()
             raise
+        self._source = source
+
+    def apply_edit(self, start, end, text):
+        """
+        Replaces the code between the positions `start` and `end` with `text`
+        and updates the parser. Positions are ``(line, column)`` tuples like
+        ``start_pos`` of the tree. Only the parts around the edit are split
+        and parsed again, the others just get their positions moved.
+
+        Unlike :meth:`update`, the lines are not split and compared again,
+        only the edited ones are. Joining and hashing the parts that are
+        reused still takes time proportional to the size of the file, but
+        that's little compared with parsing.
 
-    def _split_parts(self, source):
+        Returns the new source.
+        """
+        if self._source is None:
+            raise ValueError('The source of %s is not known, use update.'
+                             % self.module_path)
+        lines = self._lines
+        if not self._source.endswith('\n'):
+            # `_parse` has added a newline to the lines.
+            lines = self._source.splitlines(True)
+        start_offset, end_offset = _offsets(lines, start, end)
+        if start_offset > end_offset:
+            raise ValueError('The edit ends before it starts: %s, %s.'
+                             % (start, end))
+        source = self._source[:start_offset] + text + self._source[end_offset:]
+
+        first, last = start[0] - 1, end[0]
+        line_start = start_offset - start[1]
+        edited = ''.join(lines[first:last])
+        edited = edited[:start[1]] + text + edited[end_offset - line_start:]
+        if edited.startswith('\n') and first and lines[first - 1][-1] == '\r' \
+                or edited.endswith('\r') and last < len(lines) \
+                and lines[last].startswith('\n'):
+            # The edit joins a \r\n that splitlines wouldn't split.
+            self.update(source)
+            return source
+        new_lines = edited.splitlines(True)
+        lines = lines[:first] + new_lines + lines[last:]
+        self._update(source, lines, (first, first + len(new_lines)))
+        return source
+
+    def _split_parts(self, source, lines=None, changed=None):
         """
         Split the source code into different parts. This makes it possible to
         parse each part seperately and therefore cache parts of the file and
         not everything.
+
+        The state of the splitter at the start of every part is remembered.
+        On an update, the lines before the first changed line are not looked
+        at again. After the changed lines, the old parts are reused as soon as
+        a part starts with the same state as before.
+
+        :param lines: ``source.splitlines(True)``, if already known.
+        :param changed: The index of the first changed line and of the first
+            line after them in `lines`, if already known.
         """
         def gen_part():
             text = ''.join(current_lines)
@@ -283,27 +360,59 @@ class FastParser(use_metaclass(CachedFastParser)):
         # job.
         # It seems like there's no problem with form feed characters here,
         # because we're not counting lines.
-        self._lines = source.splitlines(True)
+        old_lines, old_parts = self._lines, self._parts
+        if lines is None:
+            lines = source.splitlines(True)
+        self._lines = lines
+        # Parts are tuples of the line they start with, the end of the line
+        # that started them and the state of the splitter at that line.
+        self._parts = parts = []
+        if changed is None:
+            changed = _changed_lines(old_lines, lines)
+        first, suffix_start = changed
+        delta = len(lines) - len(old_lines)
+
+        # Resume at the last part that was started by unchanged lines.
+        resume = 0
+        for index, (start, trigger_end, state) in enumerate(old_parts):
+            if trigger_end > first:
+                break
+            resume = index
+        for start, end in zip([p[0] for p in old_parts[:resume]],
+                              [p[0] for p in old_parts[1:resume + 1]]):
+            current_lines = lines[start:end]
+            yield gen_part()
+        parts += old_parts[:resume]
+        if old_parts:
+            start, trigger_end, state = old_parts[resume]
+        else:
+            # Use -1, because that indent is always smaller than any other.
+            start, trigger_end, state = 0, 0, (False, (-1, 0), False, 0, None)
+        old_starts = None
+
         current_lines = []
-        is_decorator = False
-        # Use -1, because that indent is always smaller than any other.
-        indent_list = [-1, 0]
-        new_indent = False
-        parentheses_level = 0
-        flow_indent = None
+        is_decorator, indent_list, new_indent, parentheses_level, flow_indent \
+            = state
+        indent_list = list(indent_list)
+        parts.append((start, trigger_end, state))
         previous_line = None
+        line_start = start
         # All things within flows are simply being ignored.
-        for i, l in enumerate(self._lines):
+        for i in range(start, len(lines)):
+            l = lines[i]
             # Handle backslash newline escaping.
             if l.endswith('\\\n') or l.endswith('\\\r\n'):
                 if previous_line is not None:
                     previous_line += l
                 else:
                     previous_line = l
+                    line_start = i
                 continue
             if previous_line is not None:
                 l = previous_line + l
                 previous_line = None
+            else:
+                line_start = i
 
             # check for dedents
             s = l.lstrip('\t \n\r')
@@ -312,6 +421,9 @@ class FastParser(use_metaclass(CachedFastParser)):
                 current_lines.append(l)  # Just ignore comments and blank lines
                 continue
 
+            state = (is_decorator, tuple(indent_list), new_indent,
+                     parentheses_level, flow_indent)
+            split = False
             if new_indent:
                 if indent > indent_list[-2]:
                     # Set the actual indent, not just the random old indent + 1.
@@ -324,7 +436,7 @@ class FastParser(use_metaclass(CachedFastParser)):
                 # dedent or a flow just on one line (with one simple_stmt).
                 new_indent = False
                 if flow_indent is None and current_lines and not parentheses_level:
-                    yield gen_part()
+                    split = True
                 flow_indent = None
 
             # Check lines for functions/classes and split the code there.
@@ -337,7 +449,7 @@ class FastParser(use_metaclass(CachedFastParser)):
                             flow_indent = indent
                     else:
                         if not is_decorator and not just_newlines(current_lines):
-                            yield gen_part()
+                            split = True
                     is_decorator = '@' == m.group(1)
                     if not is_decorator:
                         parentheses_level = 0
@@ -347,15 +459,39 @@ class FastParser(use_metaclass(CachedFastParser)):
                 elif is_decorator:
                     is_decorator = False
 
+            if split:
+                if line_start >= suffix_start:
+                    if old_starts is None:
+                        old_starts = dict((p[0], index)
+                                          for index, p in enumerate(old_parts))
+                    index = old_starts.get(line_start - delta)
+                    if index is not None and old_parts[index][2] == state:
+                        # The rest is the same as before.
+                        yield gen_part()
+                        for (start, trigger_end, state), end in zip(
+                                old_parts[index:],
+                                [p[0] for p in old_parts[index + 1:]] + [None]):
+                            parts.append((start + delta, trigger_end + delta,
+                                          state))
+                            end = len(lines) if end is None else end + delta
+                            current_lines = lines[start + delta:end]
+                            yield gen_part()
+                        return
+                yield gen_part()
+                parts.append((line_start, i + 1, state))
+
             parentheses_level = \
                 max(0, (l.count('(') + l.count('[') + l.count('{')
                         - l.count(')') - l.count(']') - l.count('}')))
 
             current_lines.append(l)
+        if previous_line is not None:
+            # The source ends with a backslash, don't lose it.
+            current_lines.append(previous_line)
         if current_lines:
             yield gen_part()
 
-    def _parse(self, source):
+    def _parse(self, source, lines=None, changed=None):
         """ :type source: str """
         added_newline = False
         if not source or source[-1] != '\n':
@@ -365,10 +501,16 @@ class FastParser(use_metaclass(CachedFastParser)):
             # ourselves.
             source += '\n'
             added_newline = True
+            if lines is not None:
+                lines = source.splitlines(True)
+                changed = None
 
         next_line_offset = line_offset = 0
         start = 0
-        nodes = list(self.current_node.all_sub_nodes())
+        # Old nodes by the hash of their source, so they can be reused.
+        nodes = {}
+        for node in self.current_node.all_sub_nodes():
+            nodes.setdefault(node.hash, []).append(node)
         # Now we can reset the node, because we have all the old nodes.
         self.current_node.reset_node()
         last_end_line = 1
@@ -379,7 +521,7 @@ class FastParser(use_metaclass(CachedFastParser)):
             # we know that the parser went further (`def` start in a
             # docstring). So just parse the next part.
             if line_offset + 1 == last_end_line:
-                self.current_node = self._get_node(code_part, source[start:],
+                self.current_node = self._get_node(code_part, source, start,
                                                    line_offset, nodes)
             else:
                 # Means that some lines where not fully parsed. Parse it now.
@@ -393,7 +535,7 @@ class FastParser(use_metaclass(CachedFastParser)):
                     # complicated and error-prone. Since this is not very often
                     # called - just ignore it.
                     src = ''.join(self._lines[line_offset:])
-                    self.current_node = self._get_node(code_part, src,
+                    self.current_node = self._get_node(code_part, src, 0,
                                                        line_offset, nodes)
                     last_end_line = self.current_node.parser.module.end_pos[0]
 
@@ -416,20 +558,23 @@ class FastParser(use_metaclass(CachedFastParser)):
                   % (self.module_path, self.number_parsers_used,
                      self.number_of_splits))
 
-    def _get_node(self, source, parser_code, line_offset, nodes):
+    def _get_node(self, source, parser_code, start, line_offset, nodes):
         """
-        Side effect: Alters the list of nodes.
+        Side effect: Alters the dict of nodes.
+
+        A new node parses `parser_code` from `start` on. It's only copied then,
+        most nodes are reused.
         """
         indent = len(source) - len(source.lstrip('\t '))
         self.current_node = self.current_node.parent_until_indent(indent)
 
-        h = hash(source)
-        for index, node in enumerate(nodes):
-            if node.hash == h and node.source == source:
+        for node in nodes.get(hash(source), ()):
+            if node.source == source:
                 node.reset_node()
-                nodes.remove(node)
+                nodes[node.hash].remove(node)
                 break
         else:
+            parser_code = parser_code[start:]
             tokenizer = FastTokenizer(parser_code)
             self.number_parsers_used += 1
             p = Parser(self._grammar, parser_code, self.module_path, tokenizer=tokenizer)
@@ -444,6 +589,45 @@ class FastParser(use_metaclass(CachedFastParser)):
         return node
 
 
+def _offsets(lines, *positions):
+    """
+    Returns the index in the source of `lines` (as split by
+    ``splitlines(True)``) for each ``(line, column)`` position. A column may
+    be at the end of its line, but not within or after the line break.
+    """
+    offsets = []
+    for line, column in positions:
+        if 0 < line <= len(lines):
+            length = len(lines[line - 1].splitlines()[0])
+        elif line == len(lines) + 1 \
+                and (not lines or lines[-1].splitlines()[0] != lines[-1]):
+            length = 0  # The empty line after the last line break.
+        else:
+            raise ValueError('Line %s is not in the source.' % line)
+        if not 0 <= column <= length:
+            raise ValueError('Column %s is not in line %s.' % (column, line))
+        offsets.append(sum(len(l) for l in lines[:line - 1]) + column)
+    return offsets
+
+
+def _changed_lines(old, new):
+    """
+    Returns the index of the first line that changed and the index of the
+    first line of the unchanged lines at the end of `new`.
+    """
+    first = 0
+    for first, (old_line, new_line) in enumerate(zip(old, new)):
+        if old_line != new_line:
+            break
+    else:
+        first = min(len(old), len(new))
+    end = len(new)
+    stop = max(first, len(new) - len(old) + first)
+    while end > stop and new[end - 1] == old[end - 1 - len(new) + len(old)]:
+        end -= 1
+    return first, end
+
+
 class FastTokenizer(object):
     """
     Breaks when certain conditions are met, i.e. a new function or class opens.
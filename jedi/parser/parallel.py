@@ -0,0 +1,115 @@
+"""
+Parses many modules with a pool of processes. Parsers are big object graphs
+and sending them back through a pipe would cost about as much as parsing
+them, so every process writes its parsers to the file system cache instead.
+The calling process loads them from there with :func:`jedi.cache.load_parser`,
+which only decodes function bodies when they're used (see
+:mod:`jedi.parser.serialize`).
+"""
+import multiprocessing
+import os
+import sys
+
+from jedi import cache
+from jedi import common
+from jedi import debug
+from jedi import settings
+from jedi.parser import load_grammar
+from jedi.parser.fast import FastParser
+
+
+def outdated(paths):
+    """
+    Returns the paths that are not in the file system cache or that have
+    changed since they have been cached.
+    """
+    change_times = cache.ParserPickling.change_times(paths)
+    result = []
+    for path in paths:
+        try:
+            if os.path.getmtime(path) <= change_times.get(path, -1):
+                continue
+        except OSError:
+            continue
+        result.append(path)
+    return result
+
+
+def init_worker(cache_directory, use_filesystem_cache,
+                filesystem_cache_by_content):
+    # Settings are not inherited if processes are spawned instead of forked.
+    settings.cache_directory = cache_directory
+    settings.use_filesystem_cache = use_filesystem_cache
+    settings.filesystem_cache_by_content = filesystem_cache_by_content
+
+
+def _parse_files(args):
+    """
+    Parses `paths` and saves them in one transaction. Returns the number of
+    modules that have been saved.
+    """
+    paths, name = args
+    grammar = load_grammar('grammar%s.%s' % sys.version_info[:2])
+    items = []
+    for path in paths:
+        if path in cache.pinned_paths:
+            continue  # An open buffer, the file is not what the user sees.
+        try:
+            change_time = os.path.getmtime(path)
+            with open(path, 'rb') as f:
+                source = common.source_to_unicode(f.read())
+            if name is not None and name not in source:
+                continue
+            content_hash = None
+            if settings.filesystem_cache_by_content:
+                content_hash = cache._content_hash(path)
+        except (IOError, OSError):
+            continue
+        try:
+            # Not the cached parser, that would be updated in place.
+            parser = FastParser(grammar, source, path, cached=False)
+        except Exception as e:
+            # The parser is not perfect, a broken file shouldn't stop us.
+            debug.warning('Cannot parse %s: %s', path, e)
+            continue
+        items.append((path, cache.ParserCacheItem(parser, change_time,
+                                                  content_hash)))
+    cache.ParserPickling.save_parsers(items)
+    return len(items)
+
+
+def create_pool(workers):
+    """Returns a ``multiprocessing.Pool`` with the current settings."""
+    return multiprocessing.Pool(
+        workers, init_worker,
+        (settings.cache_directory, settings.use_filesystem_cache,
+         settings.filesystem_cache_by_content)
+    )
+
+
+def parse_files(paths, workers, chunk_size=20, name=None, pool=None):
+    """
+    Parses `paths` and writes them to the file system cache.
+
+    :param workers: The number of processes. With ``1`` or if there's only
+        one chunk, everything is done in this process.
+    :param chunk_size: The number of files that a process parses and saves
+        at once.
+    :param name: If given, only files that contain this string are parsed.
+    :param pool: A pool of :func:`create_pool` that is used instead of
+        starting new processes.
+    :return: The number of modules that have been cached.
+    """
+    chunks = [(paths[i:i + chunk_size], name)
+              for i in range(0, len(paths), chunk_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        return sum(_parse_files(chunk) for chunk in chunks)
+
+    if pool is not None:
+        return sum(pool.imap_unordered(_parse_files, chunks))
+    pool = create_pool(min(workers, len(chunks)))
+    try:
+        return sum(pool.imap_unordered(_parse_files, chunks))
+    finally:
+        pool.close()
+        pool.join()
@@ -17,6 +17,7 @@ fallback token code OP, but the parser needs the actual token code.
 """
 
 # Python imports
+import os
 import pickle
 
 
@@ -86,9 +87,16 @@ class Grammar(object):
         self.start = 256
 
     def dump(self, filename):
-        """Dump the grammar tables to a pickle file."""
-        with open(filename, "wb") as f:
+        """Dump the grammar tables to a pickle file.
+
+        The file is written under a temporary name first and then renamed,
+        so that other processes never load a partly written file.
+        """
+        temp_filename = "%s.%s.tmp" % (filename, os.getpid())
+        with open(temp_filename, "wb") as f:
             pickle.dump(self.__dict__, f, 2)
+        # os.rename doesn't replace existing files on Windows.
+        getattr(os, "replace", os.rename)(temp_filename, filename)
 
     def load(self, filename):
         """Load the grammar tables from a pickle file."""
@@ -203,3 +203,98 @@ class PgenParser(object):
         except IndexError:
             # Stack is empty, set the rootnode.
             self.rootnode = newnode
+
+
+def transition_tables(grammar):
+    """
+    Returns the transition tables of `grammar`, which are computed only once.
+
+    The tables map a symbol number to a list with an entry for every state of
+    the symbol's DFA. Each entry is a tuple of a dict that maps labels to
+    actions, whether the state is accepting and whether it's accept-only. An
+    action is a tuple of the new state and either None to shift the token or
+    the symbol to push with its DFA.
+    """
+    try:
+        return grammar._transition_tables
+    except AttributeError:
+        pass
+
+    tables = {}
+    for type, (states, first) in grammar.dfas.items():
+        table = []
+        for state, arcs in enumerate(states):
+            actions = {}
+            # The first arc that matches a label wins, like in addtoken.
+            for i, newstate in arcs:
+                t, v = grammar.labels[i]
+                if t < 256:
+                    if i:
+                        actions.setdefault(i, (newstate, None))
+                else:
+                    itsdfa = grammar.dfas[t]
+                    for label in itsdfa[1]:
+                        actions.setdefault(label, (newstate, (t, itsdfa)))
+            table.append((actions, (0, state) in arcs, arcs == [(0, state)]))
+        tables[type] = table
+    grammar._transition_tables = tables
+    return tables
+
+
+class TablePgenParser(PgenParser):
+    """
+    A `PgenParser` that looks up the transitions in the precomputed
+    `transition_tables` and does shifting, pushing and popping inline. The
+    stack has the same layout, so error recovery works the same way.
+    """
+    def __init__(self, grammar, convert_node, convert_leaf, error_recovery):
+        super(TablePgenParser, self).__init__(grammar, convert_node,
+                                              convert_leaf, error_recovery)
+        self._tables = transition_tables(grammar)
+
+    def addtoken(self, type, value, prefix, start_pos):
+        """Add a token; return True if this is the end of the program."""
+        grammar = self.grammar
+        if type == tokenize.NAME:
+            ilabel = grammar.keywords.get(value) or grammar.tokens[type]
+        else:
+            ilabel = grammar.tokens[type]
+
+        stack = self.stack
+        tables = self._tables
+        while True:
+            dfa, state, node = stack[-1]
+            actions, accepting, accept_only = tables[node[0]][state]
+            try:
+                newstate, push = actions[ilabel]
+            except KeyError:
+                if accepting:
+                    # An accepting state, pop it and try something else
+                    self.pop()
+                    if not stack:
+                        # Done parsing, but another token is input
+                        raise ParseError("too much input", type, value, start_pos)
+                else:
+                    self.error_recovery(grammar, stack, type, value,
+                                        start_pos, prefix, self.addtoken)
+                    return False
+            else:
+                if push is not None:
+                    # Push a symbol
+                    symbol, itsdfa = push
+                    stack[-1] = (dfa, newstate, node)
+                    stack.append((itsdfa, 0, (symbol, [])))
+                    continue
+
+                # Shift a token; we're done with it
+                node[1].append(self.convert_leaf(grammar, type, value,
+                                                 prefix, start_pos))
+                stack[-1] = (dfa, newstate, node)
+                # Pop while we are in an accept-only state
+                while tables[node[0]][newstate][2]:
+                    self.pop()
+                    if not stack:
+                        # Done parsing!
+                        return True
+                    dfa, newstate, node = stack[-1]
+                return False
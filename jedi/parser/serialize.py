@@ -0,0 +1,563 @@
+"""
+A compact encoding of parsers for the file system cache.
+
+Pickling a parser stores every leaf as a separate object with its own prefix
+string and position tuple, together with the grammar and a lot of internal
+state of the parser. This module stores trees flat instead:
+
+- Trees are stored in post-order in a few ``array`` columns. Leaves store
+  their class, value, prefix and position, the other nodes their class and
+  the number of their children.
+- Values, prefixes and node types are indexes into a table of strings, every
+  string is stored once. After loading, equal values are the same object.
+- Lines are stored as the difference to the line of the previous leaf, which
+  keeps the numbers small.
+- Classes are stored by name, not by their module path like pickle does.
+
+The trees of a :class:`jedi.parser.fast.FastParser` are stored as one segment
+per parser node.
+
+Loading is lazy. The bodies of functions are stored separately and only
+decoded when their children are used for the first time. Names dicts know
+all their keys right away, but only look up the names of a key when it's
+used. Completing ``import numpy; numpy.`` therefore doesn't decode a single
+function body of numpy.
+
+The result of :func:`dumps` is a :mod:`marshal` string, which is fast to load
+and doesn't execute code.
+"""
+import sys
+import marshal
+from array import array
+from bisect import bisect_right
+try:
+    from itertools import accumulate
+except ImportError:
+    # Python 2
+    def accumulate(numbers):
+        total = 0
+        for number in numbers:
+            total += number
+            yield total
+
+from jedi._compatibility import is_py3, intern
+from jedi.parser import tree as pt
+from jedi.parser import Parser, ParserSyntaxError, ErrorStatement
+from jedi.parser import load_grammar, _loaded_grammars
+from jedi.parser.fast import FastParser, ParserNode, MergedNamesDict
+
+FORMAT_VERSION = 2
+"""
+Increment this number when the encoding changes.
+"""
+
+_CLASSES = dict((name, cls) for name, cls in vars(pt).items()
+                if isinstance(cls, type) and issubclass(cls, pt.Base))
+
+
+def _to_bytes(ints):
+    return ints.tobytes() if is_py3 else ints.tostring()
+
+
+def _from_bytes(data, byteorder):
+    ints = array('i')
+    if is_py3:
+        ints.frombytes(data)
+    else:
+        ints.fromstring(data)
+    if byteorder != sys.byteorder:
+        ints.byteswap()
+    return ints
+
+
+def _grammar_name(grammar):
+    for path, loaded in _loaded_grammars.items():
+        if loaded is grammar:
+            return path.rsplit('/', 1)[-1].rsplit('\\', 1)[-1][:-len('.txt')]
+    raise TypeError('Only grammars of load_grammar can be serialized.')
+
+
+def can_dump(parser):
+    return isinstance(parser, (Parser, FastParser))
+
+
+def dumps(parser):
+    """
+    Returns the encoded `parser`, which is either a
+    :class:`jedi.parser.Parser` or a :class:`jedi.parser.fast.FastParser`.
+    """
+    encoder = _Encoder()
+    if isinstance(parser, FastParser):
+        nodes = list(parser.current_node.all_sub_nodes())
+        indexes = dict((id(n), i) for i, n in enumerate(nodes, 1))
+        infos = []
+        segments = []
+        for node in nodes:
+            infos.append((indexes.get(id(node.parent), 0),
+                          node.parser.position_modifier.line, node.source,
+                          hasattr(node, '_remove_last_newline')))
+            segments.append(encoder.encode_parser(node.parser, node))
+        header = ('fast', _grammar_name(parser._grammar), parser.module_path,
+                  tuple(infos))
+    elif isinstance(parser, Parser):
+        segments = [encoder.encode_parser(parser)]
+        header = ('parser', parser.module.path)
+    else:
+        raise TypeError('Cannot serialize %r.' % parser)
+
+    return marshal.dumps((FORMAT_VERSION, sys.byteorder, tuple(encoder.classes),
+                          tuple(encoder.strings), header, tuple(segments)))
+
+
+def loads(data):
+    """
+    Returns the parser encoded in `data`. Raises ``ValueError`` if `data`
+    cannot be decoded.
+    """
+    try:
+        version, byteorder, class_names, strings, header, segments = \
+            marshal.loads(data)
+    except (EOFError, TypeError, ValueError):
+        raise ValueError('Not a serialized parser.')
+    if version != FORMAT_VERSION:
+        raise ValueError('Unsupported format version %s.' % version)
+    try:
+        classes = [_CLASSES[name] for name in class_names]
+    except KeyError as e:
+        raise ValueError('Unknown class %s.' % e)
+
+    decoder = _Decoder(byteorder, classes, strings)
+    if header[0] == 'parser':
+        return decoder.decode_parser(segments[0], header[1])
+
+    kind, grammar_name, module_path, infos = header
+    parser = FastParser.__new__(FastParser)
+    parser._grammar = load_grammar(grammar_name)
+    parser.module_path = module_path
+    parser._reset_caches()
+    parser.number_parsers_used = 0
+    parser.number_of_splits = 0
+    parser.number_of_misses = 0
+
+    nodes = [parser.current_node]
+    for (parent, line_offset, source, newline_removed), segment \
+            in zip(infos, segments):
+        p = decoder.decode_parser(segment, module_path)
+        node = ParserNode.__new__(ParserNode)
+        node._fast_module = parser.module
+        node.parent = None
+        node._node_children = []
+        node.source = source
+        node.hash = hash(source)
+        node.parser = p
+        try:
+            node._content_scope = p.module.subscopes[0]
+        except IndexError:
+            node._content_scope = p.module
+        node._old_children = list(node._content_scope.children)
+        if newline_removed:
+            node._remove_last_newline = None
+        nodes[parent].add_node(node, line_offset)
+        nodes.append(node)
+
+    # Children have to be closed before their parents.
+    for node in reversed(nodes):
+        node.close()
+    return parser
+
+
+class _Encoder(object):
+    def __init__(self):
+        self.classes = []
+        self.strings = []
+        self._class_codes = {}
+        self._string_codes = {}
+
+    def _class(self, cls):
+        try:
+            return self._class_codes[cls]
+        except KeyError:
+            if _CLASSES.get(cls.__name__) is not cls:
+                raise TypeError('Cannot serialize %s objects.' % cls.__name__)
+            self.classes.append(cls.__name__)
+            return self._class_codes.setdefault(cls, len(self.classes) - 1)
+
+    def _string(self, string):
+        try:
+            return self._string_codes[string]
+        except KeyError:
+            self.strings.append(string)
+            return self._string_codes.setdefault(string, len(self.strings) - 1)
+
+    def encode_parser(self, parser, parser_node=None):
+        """
+        Encodes one parser as a segment. If `parser_node` is given, the
+        children that the fast parser added to its scope are left out.
+        """
+        references = {}
+        module = parser.module
+        content_scope = old_children = None
+        if parser_node is not None:
+            content_scope = parser_node._content_scope
+            old_children = parser_node._old_children
+
+        main = _Columns(0, 0)
+        scopes = []
+        bodies = []
+        self._encode_tree(module, main, references, scopes, bodies,
+                          content_scope, old_children)
+        for error in module.error_statement_stacks:
+            for symbol, nodes in error.stack:
+                for node in nodes:
+                    if id(node) not in references:
+                        # Names in here were removed from all dicts.
+                        self._encode_tree(node, main, references, [], bodies)
+
+        # More bodies are appended while encoding bodies.
+        encoded = [(main, -1, scopes)]
+        for body in bodies:
+            columns = _Columns(encoded[-1][0].leaf_count,
+                               encoded[-1][0].node_count)
+            scopes = []
+            for child in body.children:
+                self._encode_tree(child, columns, references, scopes, bodies,
+                                  content_scope, old_children)
+            encoded.append((columns, references[id(body)], scopes))
+
+        # Names dicts are encoded when all names have their numbers.
+        encoded_bodies = tuple(
+            (columns.to_bytes(), columns.first_leaf, columns.first_node,
+             placeholder, tuple((references[id(scope)],
+                                 self._names_dict(references, scope.names_dict))
+                                for scope in scopes))
+            for columns, placeholder, scopes in encoded
+        )
+        errors = tuple(
+            (self._string(error.next_token), tuple(error._next_start_pos),
+             tuple((self._string(symbol), self._references(references, nodes))
+                   for symbol, nodes in error.stack))
+            for error in module.error_statement_stacks
+        )
+        syntax_errors = tuple((self._string(e.message), tuple(e.position))
+                              for e in parser.syntax_errors)
+        return (encoded_bodies, references[id(module)],
+                self._names_dict(references, module.used_names),
+                self._references(references, module.global_names),
+                errors, syntax_errors, tuple(parser._last_failed_start_pos),
+                parser.position_modifier.line)
+
+    def _references(self, references, objects):
+        # Names that are not part of the tree anymore are left out.
+        return tuple(references[id(o)] for o in objects if id(o) in references)
+
+    def _names_dict(self, references, dct):
+        if isinstance(dct, MergedNamesDict):
+            # Merged by the fast parser, only the first one belongs here.
+            dct = dct.dicts[0]
+        return tuple((self._string(key), self._references(references, names))
+                     for key, names in dct.items())
+
+    def _encode_tree(self, root, columns, references, scopes, bodies,
+                     content_scope=None, old_children=None):
+        """
+        Adds the tree in post-order. A leaf is referenced by its number times
+        two, a node by its number times two plus one. Of the bodies of
+        functions only a placeholder is added, the bodies are appended to
+        `bodies`.
+        """
+        todo = [(root, _ENTER)]
+        while todo:
+            node, state = todo.pop()
+            try:
+                children = node.children
+            except AttributeError:
+                references[id(node)] = columns.leaf_count * 2
+                line, column = node._start_pos
+                columns.add_leaf(self._class(type(node)),
+                                 self._string(node.value),
+                                 self._string(node.prefix), line, column)
+                continue
+
+            if node is content_scope:
+                # The fast parser added the children of other modules.
+                children = old_children
+            if state == _ENTER:
+                todo.append((node, _EXIT))
+                children = list(reversed(children))
+                if children and _is_function(node) \
+                        and pt.is_node(children[0], 'suite'):
+                    todo.append((children.pop(0), _PLACEHOLDER))
+                todo.extend((c, _ENTER) for c in children)
+                continue
+
+            references[id(node)] = columns.node_count * 2 + 1
+            if state == _PLACEHOLDER:
+                bodies.append(node)
+                count = -len(bodies)
+            else:
+                count = len(children)
+            columns.add_node(self._class(type(node)), count)
+            if isinstance(node, pt.Node):
+                columns.types.append(self._string(node.type))
+            elif isinstance(node, pt.Scope) and hasattr(node, 'names_dict'):
+                scopes.append(node)
+
+
+_ENTER, _EXIT, _PLACEHOLDER = range(3)
+
+
+def _is_function(node):
+    return isinstance(node, pt.Function) and not isinstance(node, pt.Lambda)
+
+
+class _Columns(object):
+    """
+    The encoded trees of one body, one array per field. Leaves and the other
+    nodes are stored separately; `runs` says how many leaves come before
+    each node in post-order. Leaves and nodes are numbered throughout a
+    segment, a body starts with the numbers `first_leaf` and `first_node`.
+    """
+    _fields = ('leaf_classes', 'values', 'prefixes', 'lines', 'columns',
+               'node_classes', 'counts', 'runs', 'types')
+
+    def __init__(self, first_leaf, first_node):
+        for field in self._fields:
+            setattr(self, field, array('i'))
+        self.first_leaf = self.leaf_count = first_leaf
+        self.first_node = self.node_count = first_node
+        self._last_line = 0
+        self._run = 0
+
+    def add_leaf(self, cls, value, prefix, line, column):
+        self.leaf_classes.append(cls)
+        self.values.append(value)
+        self.prefixes.append(prefix)
+        self.lines.append(line - self._last_line)
+        self.columns.append(column)
+        self._last_line = line
+        self._run += 1
+        self.leaf_count += 1
+
+    def add_node(self, cls, count):
+        """
+        A negative `count` is the number of a body that is stored elsewhere.
+        """
+        self.node_classes.append(cls)
+        self.counts.append(count)
+        self.runs.append(self._run)
+        self._run = 0
+        self.node_count += 1
+
+    def to_bytes(self):
+        return tuple(_to_bytes(getattr(self, f)) for f in self._fields)
+
+
+class _Decoder(object):
+    def __init__(self, byteorder, classes, strings):
+        self.byteorder = byteorder
+        self.classes = classes
+        self.strings = [intern(s) for s in strings]
+
+    def decode_parser(self, segment, module_path):
+        bodies, module, used_names, global_names, errors, syntax_errors, \
+            last_failed_start_pos, line_offset = segment
+        strings = self.strings
+        parser = Parser.__new__(Parser)
+        parser.position_modifier = pt.PositionModifier()
+        parser.position_modifier.line = line_offset
+
+        segment = _Segment(self, bodies, parser.position_modifier)
+        segment.decode_body(0)
+        resolve = segment.resolve
+
+        parser.module = module = resolve((module,))[0]
+        parser._used_names = module.used_names = \
+            _LazyNamesDict(segment, used_names)
+        parser._global_names = module.global_names = resolve(global_names)
+        parser._error_statement_stacks = module.error_statement_stacks = [
+            ErrorStatement([(strings[symbol], resolve(roots))
+                            for symbol, roots in stack],
+                           strings[next_token], parser.position_modifier,
+                           next_start_pos)
+            for next_token, next_start_pos, stack in errors
+        ]
+        module.path = module_path
+        parser.syntax_errors = [ParserSyntaxError(strings[message], position)
+                                for message, position in syntax_errors]
+        parser._last_failed_start_pos = last_failed_start_pos
+        return parser
+
+    def decode_trees(self, columns, segment):
+        """
+        Returns the leaves, the other nodes and the roots of encoded trees.
+        """
+        position_modifier = segment.position_modifier
+        leaf_classes, values, prefixes, lines, column_numbers, \
+            node_classes, counts, runs, types = \
+            [_from_bytes(c, self.byteorder) for c in columns]
+        classes = self.classes
+        strings = self.strings
+
+        leaves = [
+            classes[cls](position_modifier, strings[value], (line, column),
+                         strings[prefix])
+            for cls, value, prefix, line, column
+            in zip(leaf_classes, values, prefixes, accumulate(lines),
+                   column_numbers)
+        ]
+
+        nodes = []
+        stack = []
+        position = 0
+        for cls, count, run in zip(node_classes, counts, runs):
+            if run:
+                stack += leaves[position:position + run]
+                position += run
+            if count < 0:
+                node = _LazyBody.__new__(_LazyBody)
+                _children_slot.__set__(node, (segment, -count))
+            else:
+                cls = classes[cls]
+                node = cls.__new__(cls)
+                if count:
+                    children = stack[-count:]
+                    del stack[-count:]
+                    for child in children:
+                        child.parent = node
+                else:
+                    children = []
+                node.children = children
+            node.parent = None
+            stack.append(node)
+            nodes.append(node)
+
+        types = iter(types)
+        for node in nodes:
+            if isinstance(node, pt.Node):
+                node.type = strings[next(types)]
+            elif isinstance(node, pt.Function):
+                node.listeners = set()
+        return leaves, nodes, stack + leaves[position:]
+
+
+class _Segment(object):
+    """
+    The bodies of one parser. The first body is the module, the others are
+    bodies of functions, which are decoded when they are first used.
+    """
+    def __init__(self, decoder, bodies, position_modifier):
+        self._decoder = decoder
+        self.strings = decoder.strings
+        self._bodies = bodies
+        self.position_modifier = position_modifier
+        self._first_leaves = [body[1] for body in bodies]
+        self._first_nodes = [body[2] for body in bodies]
+        self._decoded = {}
+
+    def decode_body(self, number):
+        """
+        Returns the children of a body. Bodies of functions have to be
+        decoded through their placeholder.
+        """
+        columns, first_leaf, first_node, placeholder, scope_names = \
+            self._bodies[number]
+        leaves, nodes, roots = self._decoder.decode_trees(columns, self)
+        self._decoded[number] = leaves, nodes
+        for reference, encoded in scope_names:
+            scope = nodes[(reference >> 1) - first_node]
+            scope.names_dict = _LazyNamesDict(self, encoded)
+        return roots
+
+    def resolve(self, references):
+        """
+        Returns the leaves and nodes of `references`, bodies are decoded if
+        necessary.
+        """
+        result = []
+        for reference in references:
+            number = reference >> 1
+            if reference & 1:
+                firsts = self._first_nodes
+            else:
+                firsts = self._first_leaves
+            body = bisect_right(firsts, number) - 1
+            try:
+                leaves, nodes = self._decoded[body]
+            except KeyError:
+                placeholder = self._bodies[body][3]
+                self.resolve((placeholder,))[0].children
+                leaves, nodes = self._decoded[body]
+            if reference & 1:
+                result.append(nodes[number - self._first_nodes[body]])
+            else:
+                result.append(leaves[number - self._first_leaves[body]])
+        return result
+
+
+_children_slot = pt.BaseNode.__dict__['children']
+
+
+class _LazyBody(pt.Node):
+    """
+    The placeholder for the body of a function. When its children are used
+    the first time, they are decoded and it becomes a normal
+    :class:`jedi.parser.tree.Node`.
+    """
+    __slots__ = ()
+
+    @property
+    def children(self):
+        segment, number = _children_slot.__get__(self)
+        children = segment.decode_body(number)
+        for child in children:
+            child.parent = self
+        _children_slot.__set__(self, children)
+        self.__class__ = pt.Node
+        return children
+
+    @children.setter
+    def children(self, value):
+        _children_slot.__set__(self, value)
+        self.__class__ = pt.Node
+
+
+class _LazyNamesDict(dict):
+    """
+    A names dict that knows all its keys. The names of a key are looked up
+    the first time they are used, which may decode bodies of functions.
+    """
+    def __init__(self, segment, encoded):
+        strings = segment.strings
+        super(_LazyNamesDict, self).__init__(
+            (strings[key], references) for key, references in encoded
+        )
+        self._segment = segment
+
+    def __getitem__(self, key):
+        names = dict.__getitem__(self, key)
+        if isinstance(names, tuple):
+            names = self._segment.resolve(names)
+            dict.__setitem__(self, key, names)
+        return names
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def copy(self):
+        return dict(self.items())
@@ -56,6 +56,11 @@ class PositionModifier(object):
 
 zero_position_modifier = PositionModifier()
 
+# Leaves store their position as one integer ``line << 32 | column``, which
+# needs less memory than a tuple.
+_COLUMN_BITS = 32
+_COLUMN_MASK = (1 << _COLUMN_BITS) - 1
+
 
 class DocstringMixin(object):
     __slots__ = ()
@@ -146,18 +151,28 @@ class Base(object):
 
 
 class Leaf(Base):
-    __slots__ = ('position_modifier', 'value', 'parent', '_start_pos', 'prefix')
+    __slots__ = ('position_modifier', 'value', 'parent', '_pos', 'prefix')
 
     def __init__(self, position_modifier, value, start_pos, prefix=''):
         self.position_modifier = position_modifier
         self.value = value
-        self._start_pos = start_pos
+        self._pos = start_pos[0] << _COLUMN_BITS | start_pos[1]
         self.prefix = prefix
         self.parent = None
 
+    @property
+    def _start_pos(self):
+        """The position without the offset of the `position_modifier`."""
+        return self._pos >> _COLUMN_BITS, self._pos & _COLUMN_MASK
+
+    @_start_pos.setter
+    def _start_pos(self, value):
+        self._pos = value[0] << _COLUMN_BITS | value[1]
+
     @property
     def start_pos(self):
-        return self._start_pos[0] + self.position_modifier.line, self._start_pos[1]
+        pos = self._pos
+        return (pos >> _COLUMN_BITS) + self.position_modifier.line, pos & _COLUMN_MASK
 
     @start_pos.setter
     def start_pos(self, value):
@@ -165,12 +180,12 @@ class Leaf(Base):
 
     @property
     def end_pos(self):
-        return (self._start_pos[0] + self.position_modifier.line,
-                self._start_pos[1] + len(self.value))
+        pos = self._pos
+        return ((pos >> _COLUMN_BITS) + self.position_modifier.line,
+                (pos & _COLUMN_MASK) + len(self.value))
 
     def move(self, line_offset, column_offset):
-        self._start_pos = (self._start_pos[0] + line_offset,
-                           self._start_pos[1] + column_offset)
+        self._pos += (line_offset << _COLUMN_BITS) + column_offset
 
     def get_previous(self):
         """
@@ -1,6 +1,7 @@
 import re
 import os
 import keyword
+import copy
 
 from jedi import cache
 from jedi import common
@@ -31,6 +32,16 @@ class UserContext(object):
 
         self._relevant_temp = None
 
+    def with_position(self, position):
+        """
+        Returns a context for another position in the same source.
+        """
+        if not self._line_cache:
+            self._line_cache = common.splitlines(self.source)
+        new = UserContext(self.source, position)
+        new._line_cache = self._line_cache
+        return new
+
     @cache.underscore_memoization
     def get_path_until_cursor(self):
         """ Get the path under the cursor. """
@@ -285,6 +296,18 @@ class UserContextParser(object):
             parser = Parser(self._grammar, self._source, self._path)
         return parser
 
+    def with_position(self, position, user_context):
+        """
+        Returns a copy for another position that doesn't parse again.
+        """
+        new = copy.copy(self)
+        new._position = position
+        new._user_context = user_context
+        # Remove the memoized results that depend on the position.
+        for name in ('_user_stmt', '_user_stmt_with_whitespace', '_user_scope'):
+            new.__dict__.pop(name, None)
+        return new
+
     @cache.underscore_memoization
     def user_stmt(self):
         module = self.module()
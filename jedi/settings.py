@@ -26,12 +26,15 @@ Filesystem cache
 
 .. autodata:: cache_directory
 .. autodata:: use_filesystem_cache
+.. autodata:: filesystem_cache_limit
+.. autodata:: filesystem_cache_by_content
 
 
 Parser
 ~~~~~~
 
 .. autodata:: fast_parser
+.. autodata:: table_driven_parser
 
 
 Dynamic stuff
@@ -41,6 +44,8 @@ Dynamic stuff
 .. autodata:: dynamic_params
 .. autodata:: dynamic_params_for_other_modules
 .. autodata:: additional_dynamic_modules
+.. autodata:: dynamic_search_workers
+.. autodata:: introspection_workers
 .. autodata:: auto_import_modules
 
 
@@ -63,12 +68,14 @@ definitely worse in some cases. But a completion should also be fast.
 .. autodata:: max_function_recursion_level
 .. autodata:: max_executions_without_builtins
 .. autodata:: max_executions
+.. autodata:: time_budget
 .. autodata:: scale_call_signatures
 
 
 Caching
 ~~~~~~~
 
+.. autodata:: memory_cache_limit
 .. autodata:: star_import_cache_validity
 .. autodata:: call_signatures_validity
 
@@ -132,6 +139,23 @@ On Linux, if environment variable ``$XDG_CACHE_HOME`` is set,
 ``$XDG_CACHE_HOME/jedi`` is used instead of the default one.
 """
 
+filesystem_cache_limit = 512 * 2 ** 20
+"""
+The maximum size of the filesystem cache in bytes. If the cache grows bigger,
+the modules that haven't been used for the longest time are removed. ``None``
+means no limit.
+"""
+
+filesystem_cache_by_content = False
+"""
+Check cached modules against a hash of their source instead of the
+modification time. This costs reading the file, but the cache stays valid if
+only the modification times change, e.g. after a ``git checkout`` or in a
+rebuilt container. Modules are also found if they were cached for the same
+content at another path, which means that a cache directory can be copied to
+another machine or shipped prebuilt.
+"""
+
 # ----------------
 # parser
 # ----------------
@@ -143,6 +167,13 @@ something has been changed e.g. to a function. If this happens, only the
 function is being reparsed.
 """
 
+table_driven_parser = True
+"""
+Parse with transition tables that are precomputed once per grammar instead of
+walking the DFA arcs and first sets for every token. The result is the same,
+it's just faster.
+"""
+
 # ----------------
 # dynamic stuff
 # ----------------
@@ -169,6 +200,22 @@ Additional modules in which |jedi| checks if statements are to be found. This
 is practical for IDEs, that want to administrate their modules themselves.
 """
 
+dynamic_search_workers = 1
+"""
+The number of processes that parse the other modules searched for usages and
+dynamic params. They write to the file system cache, which therefore has to
+be enabled. With ``1`` the modules are parsed one after another while they
+are searched.
+"""
+
+introspection_workers = 0
+"""
+The number of processes that import compiled modules (C extensions like numpy
+or PyQt) and generate Python stubs of them, see
+:mod:`jedi.evaluate.compiled.sandbox`. With ``0`` they are imported into this
+process. Modules that are already imported here are always used directly.
+"""
+
 dynamic_flow_information = True
 """
 Check for `isinstance` and other information to infer a type.
@@ -214,11 +261,34 @@ max_executions = 250
 A maximum amount of time, the completion may use.
 """
 
+time_budget = None
+"""
+Milliseconds that one API call may spend inferring, e.g. ``100``. The number
+of executions says little about the time they take, so if this is set,
+:data:`max_executions` and :data:`max_executions_without_builtins` are not
+used. Once the budget is used up, functions are not executed anymore and
+dynamic params are not searched, the results are whatever has been found
+until then.
+"""
+
 scale_call_signatures = 0.1
 """
 Because call_signatures is normally used on every single key hit, it has
 to be faster than a normal completion. This is the factor that is used to
-scale `max_executions` and `max_until_execution_unique`:
+scale `max_executions`, `max_until_execution_unique` and `time_budget`:
+"""
+
+# ----------------
+# memory cache
+# ----------------
+
+memory_cache_limit = None
+"""
+The maximum number of lines of the parsed modules that are kept in memory,
+e.g. ``10 ** 6``. If there are more, the modules that haven't been used for
+the longest time are removed and :class:`jedi.Project` forgets what it has
+inferred from them. The buffers that are edited in a project are never
+removed. ``None`` means no limit.
 """
 
 # ----------------
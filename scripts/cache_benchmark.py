@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Compares the two ways of storing parsers in the file system cache: pickle and
+the encoding of ``jedi.parser.serialize``. For every module, the time to dump
+and load the fast parser and the size of the data are printed.
+
+Usage:
+  cache_benchmark.py [<module>...] [-n <number>]
+  cache_benchmark.py -h | --help
+
+Options:
+  -h --help     Show this screen.
+  -n <number>   Number of loads per module [default: 10].
+"""
+import gc
+import os
+import sys
+import time
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from docopt import docopt
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__) + '/..'))
+from jedi import common
+from jedi.parser import load_grammar
+from jedi.parser.fast import FastParser
+from jedi.parser import serialize
+
+
+DEFAULT_MODULES = ['decimal', 'inspect', 'tarfile', 'turtle', 'numpy']
+
+
+def module_path(name):
+    """Return the path of the module's source, or None if it's unknown."""
+    try:
+        module = __import__(name, fromlist=['__name__'])
+    except ImportError:
+        return None
+    path = getattr(module, '__file__', None)
+    if path is None:
+        return None
+    if path.endswith(('.pyc', '.pyo')):
+        path = path[:-1]
+    return path if path.endswith('.py') else None
+
+
+def measure(func, number):
+    """Return the average time of `func` without the garbage collector."""
+    gc.disable()
+    try:
+        start = time.time()
+        for i in range(number):
+            func()
+        return (time.time() - start) / number
+    finally:
+        gc.enable()
+
+
+def main(args):
+    number = int(args['-n'])
+    grammar = load_grammar()
+    print('Module         | Format    | Size (kB) | Dump (ms) | Load (ms)')
+    for name in args['<module>'] or DEFAULT_MODULES:
+        path = module_path(name)
+        if path is None:
+            print('%-14s | not found' % name)
+            continue
+        with open(path, 'rb') as f:
+            source = common.source_to_unicode(f.read())
+        parser = FastParser(grammar, source, path)
+
+        formats = [
+            ('pickle', lambda: pickle.dumps(parser, pickle.HIGHEST_PROTOCOL),
+             pickle.loads),
+            ('serialize', lambda: serialize.dumps(parser), serialize.loads),
+        ]
+        for format, dumps, loads in formats:
+            data = dumps()
+            dump_time = measure(dumps, 1)
+            load_time = measure(lambda: loads(data), number)
+            print('%-14s | %-9s | %9.1f | %9.1f | %9.1f'
+                  % (name, format, len(data) / 1024.0, dump_time * 1000,
+                     load_time * 1000))
+
+
+if __name__ == '__main__':
+    main(docopt(__doc__))
@@ -0,0 +1,87 @@
+#! /usr/bin/env python
+"""
+Measures the memory of the parser trees of large libraries.
+
+All Python files of each library are parsed and the memory that the trees use
+is printed, together with the number of leaves. Run it before and after a
+change of :mod:`jedi.parser.tree` to see how many MB it saves.
+
+You can provide additional libraries via command line arguments.
+
+Note: This requires Python 3.4+ for the tracemalloc module.
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__) + '/..'))
+from jedi._compatibility import find_module
+from jedi.parser import Parser, load_grammar
+from jedi.common import source_to_unicode
+
+
+def library_files(name):
+    """Returns the Python files of the package or module `name`."""
+    try:
+        path = find_module(name)[1]
+    except ImportError:
+        return []
+    if not os.path.isdir(path):
+        return [path]
+    return [os.path.join(root, f)
+            for root, dirs, files in os.walk(path)
+            for f in files if f.endswith('.py')]
+
+
+def count_leaves(node):
+    try:
+        children = node.children
+    except AttributeError:
+        return 1
+    return sum(count_leaves(c) for c in children)
+
+
+def profile_parse(grammar, files):
+    """Parses `files`, recording the time and memory of the trees."""
+    sources = []
+    for path in files:
+        with open(path, 'rb') as f:
+            sources.append(source_to_unicode(f.read()))
+
+    gc.collect()
+    base = tracemalloc.get_traced_memory()[0]
+    t0 = time.time()
+    modules = []
+    for source in sources:
+        try:
+            modules.append(Parser(grammar, source).module)
+        except Exception:
+            pass  # Some files still crash the error recovery.
+    elapsed = time.time() - t0
+    gc.collect()
+    used = (tracemalloc.get_traced_memory()[0] - base) / 2 ** 20
+    return elapsed, used, sum(count_leaves(m) for m in modules)
+
+
+def main(libraries):
+    grammar = load_grammar()
+    tracemalloc.start()
+    print('Time (s) | Mem (MB) |   Leaves | Library')
+    print('-----------------------------------------')
+    total = [0, 0, 0]
+    for library in libraries:
+        files = library_files(library)
+        if files:
+            result = profile_parse(grammar, files)
+            print('%8.1f | %8.1f | %8d | %s' % (result + (library,)))
+            total = [t + r for t, r in zip(total, result)]
+    print('-----------------------------------------')
+    print('%8.1f | %8.1f | %8d | %s' % tuple(total + ['Total']))
+
+
+if __name__ == '__main__':
+    libraries = ['json', 'email', 'logging', 'unittest', 'xml', 'jedi',
+                 'numpy', 'django']
+    libraries += sys.argv[1:]
+    main(libraries)
@@ -2,6 +2,7 @@
 Test all things related to the ``jedi.api`` module.
 """
 
+import threading
 from textwrap import dedent
 
 from jedi import api
@@ -143,3 +144,44 @@ def test_goto_definition_not_multiple():
 def test_usage_description():
     descs = [u.description for u in api.Script("foo = ''; foo").usages()]
     assert set(descs) == set(["foo = ''", 'foo'])
+
+
+def test_usages_keep_settings(monkeypatch):
+    """Other threads still use flow information while usages run."""
+    from jedi import settings
+    from jedi.api import usages
+    found = []
+
+    def check(evaluator, definitions, mods):
+        found.append((settings.dynamic_flow_information,
+                      evaluator.flow_information))
+        return []
+
+    monkeypatch.setattr(usages, 'usages', check)
+    script = api.Script("foo = ''; foo")
+    script.usages()
+    assert found == [(True, False)]
+    assert script._evaluator.flow_information
+
+
+def test_scripts_in_threads():
+    source = 'import json\ndef f(x):\n    return x\nf(json).l'
+
+    def complete():
+        return [c.name for c in api.Script(source, path='example.py').completions()]
+
+    expected = complete()
+    assert expected == ['load', 'loads']
+
+    results = []
+
+    def run():
+        for _ in range(5):
+            results.append(complete())
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [expected] * 20
@@ -0,0 +1,24 @@
+"""
+Tests for :mod:`jedi.api.linter`.
+"""
+import pytest
+
+from jedi.api import linter
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+@pytest.mark.parametrize('workers', [1, 2])
+def test_analyze(tmpdir, workers):
+    tmpdir.join('a.py').write('def f(a):\n    return a\n')
+    tmpdir.join('b.py').write('import a\na.f(1, 2)\na.g\n')
+    tmpdir.join('c.py').write('import a\nundefined\n')
+    tmpdir.join('no_python.txt').write('undefined\n')
+
+    errors = list(linter.analyze([str(tmpdir)], workers=workers))
+    found = sorted((e.path, e.line, e.column, e.name) for e in errors)
+    assert found == [
+        (str(tmpdir.join('b.py')), 2, 7, 'type-error-too-many-arguments'),
+        (str(tmpdir.join('b.py')), 3, 2, 'attribute-error'),
+        (str(tmpdir.join('c.py')), 2, 0, 'name-error'),
+    ]
+    assert linter.error_to_dict(errors[0])['path'] == errors[0].path
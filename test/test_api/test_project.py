@@ -0,0 +1,165 @@
+"""
+Tests for :class:`jedi.Project` and the server that is built on top of it.
+"""
+import json
+from io import StringIO
+
+from jedi import Project, Script
+from jedi import cache
+from jedi import settings
+from jedi._compatibility import u
+from jedi.api.server import Server
+from jedi.parser import load_grammar
+from jedi.parser.fast import FastParser
+
+
+def test_project_reuses_evaluator():
+    project = Project()
+    s1 = project.script('import json; json.l', 1, 19, 'example.py')
+    assert [c.name for c in s1.completions()] == ['load', 'loads']
+
+    s2 = project.script('import json; json.d', 1, 19, 'example.py')
+    assert s1._evaluator is s2._evaluator
+    assert 'dumps' in [c.name for c in s2.completions()]
+
+
+def test_project_invalidates_changed_buffers():
+    project = Project()
+    source = 'def f():\n    return %s\nf()'
+    script = project.script(source % '1', 3, 3, 'example.py')
+    assert [d.name for d in script.goto_definitions()] == ['int']
+
+    script = project.script(source % "''", 3, 3, 'example.py')
+    assert [d.name for d in script.goto_definitions()] == ['str']
+
+
+def test_project_many_requests():
+    """
+    The recursion limitations must not accumulate over the lifetime of a
+    project.
+    """
+    project = Project()
+    for i in range(50):
+        script = project.script('import os; os.path.jo', 1, 21, 'example.py')
+        assert [c.name for c in script.completions()] == ['join']
+
+
+def test_project_goto_definitions_many():
+    source = 'import json\nx = 3\njson.loads(x)\n'
+    positions = [(3, 0), (3, 7), (3, 11), (2, 4), (3, 7)]
+    results = Project().goto_definitions_many('example.py', positions, source)
+
+    expected = [[d.name for d in Script(source, line, column,
+                                        'example.py').goto_definitions()]
+                for line, column in positions]
+    assert [[d.name for d in r] for r in results] == expected
+    assert expected[:3] == [['json'], ['loads'], ['int']]
+
+
+def test_project_reference_edges(tmpdir):
+    tmpdir.join('a.py').write('def f(a):\n    return len(a)\nx = f\n')
+    tmpdir.join('b.py').write('import a\na.f(1)\n')
+    a, b = str(tmpdir.join('a.py')), str(tmpdir.join('b.py'))
+
+    edges = list(Project().reference_edges([str(tmpdir)]))
+    assert edges == [
+        (a, 2, 11, None, None, None),
+        (a, 3, 4, a, 1, 4),
+        (b, 2, 0, b, 1, 7),
+        (b, 2, 2, a, 1, 4),
+    ]
+
+
+def test_server_requests():
+    lines = [
+        {'id': 1, 'method': 'completions',
+         'params': {'source': 'import json; json.l', 'line': 1, 'column': 19}},
+        {'id': 2, 'method': 'goto_definitions',
+         'params': {'source': 'x = 3\nx', 'line': 2, 'column': 1}},
+        {'id': 3, 'method': 'foo'},
+        {'id': 4, 'method': 'shutdown'},
+        {'id': 5, 'method': 'completions'},
+    ]
+    infile = StringIO(u('\n'.join(json.dumps(l) for l in lines) + '\n'))
+    outfile = StringIO()
+    Server().serve(infile, outfile)
+
+    responses = [json.loads(l) for l in outfile.getvalue().splitlines()]
+    assert [r['id'] for r in responses] == [1, 2, 3, 4]
+    assert [c['name'] for c in responses[0]['result']] == ['load', 'loads']
+    assert responses[1]['result'][0]['name'] == 'int'
+    assert 'foo' in responses[2]['error']
+    assert responses[3]['result'] is None
+
+
+def test_server_invalid_json():
+    response = json.loads(Server().handle_line('{'))
+    assert response['id'] is None
+    assert 'Invalid JSON' in response['error']
+
+
+def test_project_keeps_unrelated_results():
+    project = Project()
+    project.script('import json; json.loads', 1, 20, 'a.py').goto_definitions()
+    memoize_cache = project._evaluator.memoize_cache
+    count = sum(len(memo) for memo in memoize_cache.values())
+
+    project.script('import json; json.dumps', 1, 20, 'a.py')
+    remaining = sum(len(memo) for memo in memoize_cache.values())
+    assert 0 < remaining < count
+
+    # Only the results of the changed module are in its index, nothing keeps
+    # the old module alive.
+    evaluator = project._evaluator
+    for module, entries in evaluator.memoize_by_module.items():
+        for entry in entries:
+            assert module in evaluator.memoize_modules[entry]
+    assert len(evaluator.memoize_modules) <= remaining
+
+
+def test_project_invalidates_dependent_results(tmpdir):
+    a = tmpdir.join('a.py')
+    a.write('x = 1\n')
+    b = str(tmpdir.join('b.py'))
+    source = 'from a import x\nx'
+
+    project = Project()
+    script = project.script(source, 2, 1, b)
+    assert [d.name for d in script.goto_definitions()] == ['int']
+
+    a.write("x = ''\n")
+    # Make sure that the modification time changes.
+    a.setmtime(a.mtime() + 10)
+    project.invalidate(str(a))
+    script = project.script(source, 2, 1, b)
+    assert [d.name for d in script.goto_definitions()] == ['str']
+
+
+def test_project_memory_cache_limit(monkeypatch, tmpdir):
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    monkeypatch.setattr(cache, 'pinned_paths', set())
+    monkeypatch.setattr(settings, 'memory_cache_limit', 1)
+    a = str(tmpdir.join('a.py'))
+    tmpdir.join('a.py').write('def f():\n    return 1\n')
+    b = str(tmpdir.join('b.py'))
+    source = 'from a import f\nf()'
+
+    project = Project()
+    script = project.script(source, 2, 3, b)
+    assert [d.name for d in script.goto_definitions()] == ['int']
+    module = cache.parser_cache[a].parser.module
+
+    # Parsing another module evicts a.py, but never the buffer.
+    parser = FastParser(load_grammar(), u('x = 1\n'), 'other')
+    cache.save_parser(None, 'other', parser, pickling=False)
+    assert a not in cache.parser_cache
+    assert b in cache.parser_cache
+    assert project._evaluator.evicted_modules == [module]
+
+    script = project.script(source, 2, 3, b)
+    assert project._evaluator.evicted_modules == []
+    assert [d.name for d in script.goto_definitions()] == ['int']
+    assert cache.parser_cache[a].parser.module is not module
+
+    project.close(b)
+    assert b not in cache.pinned_paths
@@ -0,0 +1,59 @@
+"""
+Tests for :func:`jedi.warm_cache`.
+"""
+import pytest
+
+import jedi
+from jedi import cache
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+@pytest.mark.parametrize('workers', [1, 2])
+def test_warm_cache(monkeypatch, tmpdir, workers):
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    tmpdir.join('first.py').write('def foo():\n    pass\n')
+    tmpdir.join('no_python.txt').write('def bar():\n')
+    package = tmpdir.mkdir('package')
+    for i in range(5):
+        package.join('module%s.py' % i).write('x = %s\n' % i)
+
+    assert jedi.warm_cache([str(tmpdir)], workers=workers, chunk_size=2) == 6
+    parser = cache.load_parser(str(tmpdir.join('first.py')), None)
+    assert parser.module.subscopes[0].name.value == 'foo'
+    assert cache.load_parser(str(package.join('module3.py')), None)
+
+    # Modules that are already cached are skipped.
+    assert jedi.warm_cache([str(tmpdir)], workers=workers) == 0
+    package.join('module3.py').setmtime(package.join('module3.py').mtime() + 10)
+    assert jedi.warm_cache([str(tmpdir)], workers=workers) == 1
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_warm_cache_compiled(monkeypatch, tmpdir):
+    import posix
+    from jedi._compatibility import builtins
+    from jedi.evaluate.compiled import members
+    monkeypatch.setattr(members, '_tables', {})
+
+    assert jedi.warm_cache([str(tmpdir)], workers=2, compiled=True) > 0
+    # The tables have been built by other processes.
+    assert members._tables == {}
+    assert members.lookup(posix)['getcwd'][0] == 'function'
+    assert members.lookup(builtins)['str'][0] == 'class'
+    assert 'upper' in members.lookup(str)
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_warm_cache_keeps_buffers(monkeypatch, tmpdir):
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    monkeypatch.setattr(cache, 'pinned_paths', set())
+    tmpdir.join('buffer.py').write('on_disk = 1\n')
+    tmpdir.join('other.py').write('x = 1\n')
+    path = str(tmpdir.join('buffer.py'))
+    project = jedi.Project()
+    project.script('typed = 1\n', 1, 0, path)._parser.module()
+
+    # The open buffer is neither parsed from the file nor changed.
+    assert jedi.warm_cache([str(tmpdir)], workers=1) == 1
+    module = cache.parser_cache[path].parser.module
+    assert list(module.names_dict) == ['typed']
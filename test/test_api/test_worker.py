@@ -0,0 +1,77 @@
+"""
+Tests for :mod:`jedi.api.worker`.
+"""
+import threading
+import time
+
+import pytest
+
+from jedi import Project
+from jedi.api.worker import Worker, CancelledError
+
+
+def names(project, source):
+    script = project.script(source, path='example.py')
+    return sorted(d.name for d in script.goto_definitions())
+
+
+def test_worker():
+    worker = Worker()
+    source = 'def f(x):\n    return x\nf(1)'
+    try:
+        # Inference stops right away, but partial results are not memoized.
+        assert worker.submit(names, (source,), timeout=0).result(5) == []
+        assert worker.submit(names, (source,)).result(5) == ['int']
+
+        with pytest.raises(ZeroDivisionError):
+            worker.submit(lambda project: 1 / 0).result(5)
+    finally:
+        worker.shutdown()
+
+
+def test_partial_results_not_memoized():
+    project = Project()
+    source = 'def f(x):\n    return x\ny = f(1)\n'
+    module = project.script(source, path='example.py')._parser.module()
+    stmt = module.statements[0]
+    evaluator = project._evaluator
+
+    evaluator.deadline = time.time() - 1
+    assert evaluator.eval_statement(stmt) == []
+    evaluator.deadline = None
+    evaluator.reset_recursion_limitations()
+    assert [t.obj for t in evaluator.eval_statement(stmt)] == [1]
+
+
+def test_worker_cancel():
+    worker = Worker()
+    started = threading.Event()
+    release = threading.Event()
+
+    def block(project):
+        started.set()
+        release.wait(5)
+
+    try:
+        blocking = worker.submit(block)
+        request = worker.submit(names, ('x = 1\nx',))
+        started.wait(5)
+        request.cancel()
+        release.set()
+        with pytest.raises(CancelledError):
+            request.result(5)
+        assert blocking.result(5) is None
+    finally:
+        worker.shutdown()
+
+
+def test_worker_async():
+    asyncio = pytest.importorskip('asyncio')
+    worker = Worker()
+    loop = asyncio.new_event_loop()
+    try:
+        future = worker.submit_async(names, ('x = 1\nx',), loop=loop)
+        assert loop.run_until_complete(future) == ['int']
+    finally:
+        loop.close()
+        worker.shutdown()
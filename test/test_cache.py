@@ -3,12 +3,20 @@ Test all things related to the ``jedi.cache`` module.
 """
 
 import time
+import multiprocessing
+import sqlite3
+import threading
+import weakref
 
 import pytest
 
 import jedi
 from jedi import settings, cache
+from jedi._compatibility import u
 from jedi.cache import ParserCacheItem, ParserPickling
+from jedi import parser
+from jedi.parser import load_grammar
+from jedi.parser.fast import FastParser
 
 
 ParserPicklingCls = type(ParserPickling)
@@ -62,6 +70,255 @@ def test_modulepickling_delete_incompatible_cache():
     assert cached2 is None
 
 
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_save_many():
+    cache = ParserPicklingCls()
+    items = [('fake path %s' % i, ParserCacheItem('fake parser %s' % i))
+             for i in range(10)]
+    cache.save_parsers(items)
+    for path, item in items:
+        assert load_stored_item(cache, path, item) == item.parser
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_outdated():
+    cache = ParserPicklingCls()
+    item = ParserCacheItem('fake parser')
+    cache.save_parser('fake path', item)
+    assert cache.load_parser('fake path', item.change_time + 1) is None
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_evict_least_recently_used(monkeypatch):
+    cache = ParserPicklingCls()
+    item = ParserCacheItem('x' * 1000)
+    cache.save_parser('path 1', item)
+    cache.save_parser('path 2', item)
+    # Using the first path makes the second one the least recently used.
+    time.sleep(0.01)
+    assert load_stored_item(cache, 'path 1', item) == item.parser
+
+    monkeypatch.setattr(settings, 'filesystem_cache_limit', 2500)
+    cache.save_parser('path 3', item)
+    assert load_stored_item(cache, 'path 1', item) == item.parser
+    assert load_stored_item(cache, 'path 2', item) is None
+    assert load_stored_item(cache, 'path 3', item) == item.parser
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_reads_dont_wait_for_writers():
+    cache = ParserPicklingCls()
+    item = ParserCacheItem('fake parser')
+    cache.save_parser('fake path', item)
+
+    # Another process is writing.
+    writer = sqlite3.connect(cache._get_path('cache.db'))
+    writer.execute('BEGIN IMMEDIATE')
+    try:
+        start = time.time()
+        for i in range(150):
+            assert load_stored_item(cache, 'fake path', item) == item.parser
+        assert time.time() - start < cache.lock_timeout / 2
+    finally:
+        writer.rollback()
+        writer.close()
+    # The usage times were dropped, nothing piles up.
+    assert len(cache._state.touched) < 100
+
+
+def _save_in_process(args):
+    cache_directory, number = args
+    settings.cache_directory = cache_directory
+    for i in range(20):
+        path = 'fake path %s %s' % (number, i)
+        ParserPickling.save_parser(path, ParserCacheItem('fake parser'))
+    return number
+
+
+def test_modulepickling_multiple_processes(monkeypatch, tmpdir):
+    """
+    Processes that share a cache directory must not lose each other's
+    entries.
+    """
+    monkeypatch.setattr(settings, 'cache_directory', str(tmpdir))
+    item = ParserCacheItem('fake parser')
+    # The forked processes inherit this connection.
+    ParserPickling.save_parser('fake path', item)
+
+    pool = multiprocessing.Pool(4)
+    try:
+        pool.map(_save_in_process, [(str(tmpdir), n) for n in range(4)])
+    finally:
+        pool.close()
+        pool.join()
+
+    for number in range(4):
+        for i in range(20):
+            path = 'fake path %s %s' % (number, i)
+            assert load_stored_item(ParserPickling, path, item) == item.parser
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_threads():
+    cache = ParserPicklingCls()
+    item = ParserCacheItem('fake parser')
+    cache.save_parser('fake path', item)
+
+    loaded = []
+    thread = threading.Thread(
+        target=lambda: loaded.append(load_stored_item(cache, 'fake path', item))
+    )
+    thread.start()
+    thread.join()
+    assert loaded == [item.parser]
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_broken_entry():
+    cache = ParserPicklingCls()
+    item = ParserCacheItem('fake parser')
+    cache.save_parser('fake path', item)
+
+    connection = sqlite3.connect(cache._get_path('cache.db'))
+    with connection:
+        connection.execute("UPDATE parsers SET data = x'0000'")
+    connection.close()
+    assert load_stored_item(cache, 'fake path', item) is None
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_broken_database():
+    cache = ParserPicklingCls()
+    with open(cache._get_path('cache.db'), 'wb') as f:
+        f.write(b'no database' * 100)
+
+    item = ParserCacheItem('fake parser')
+    cache.save_parser('fake path', item)
+    assert load_stored_item(cache, 'fake path', item) == item.parser
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_parser_tree(monkeypatch):
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    pickling = ParserPicklingCls()
+    source = u('def foo():\n    pass\n')
+    parser = FastParser(load_grammar(), source, 'fake path')
+    item = ParserCacheItem(parser)
+    pickling.save_parser('fake path', item)
+
+    connection = sqlite3.connect(pickling._get_path('cache.db'))
+    assert connection.execute('SELECT format FROM parsers').fetchall() \
+        == [('tree',)]
+    connection.close()
+
+    loaded = load_stored_item(pickling, 'fake path', item)
+    assert isinstance(loaded, FastParser)
+    assert loaded.module.get_code() == source
+    assert loaded.module.subscopes[0].name.value == 'foo'
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_name_index(monkeypatch):
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    pickling = ParserPicklingCls()
+    grammar = load_grammar()
+    for path, source in [('a', 'foo = 1\nfoo\n'), ('b', 'bar = foo\n')]:
+        parser = FastParser(grammar, u(source), path)
+        pickling.save_parser(path, ParserCacheItem(parser))
+
+    assert pickling.find_name('foo') == {'a': [(1, 0), (2, 0)], 'b': [(1, 6)]}
+    assert pickling.find_name('foo', ['b', 'c']) == {'b': [(1, 6)]}
+    assert pickling.find_name('baz') == {}
+
+    # Saving a module again replaces its names.
+    parser = FastParser(grammar, u('baz = 1\n'), 'b')
+    pickling.save_parser('b', ParserCacheItem(parser))
+    assert pickling.find_name('foo') == {'a': [(1, 0), (2, 0)]}
+    assert pickling.find_name('baz') == {'b': [(1, 0)]}
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_by_content(monkeypatch, tmpdir):
+    monkeypatch.setattr(settings, 'filesystem_cache_by_content', True)
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    source = u('def foo():\n    pass\n')
+    path = tmpdir.join('first.py')
+    path.write(source)
+    parser = FastParser(load_grammar(), source, str(path))
+    cache.save_parser(str(path), None, parser)
+
+    # A new modification time doesn't matter if the content is the same.
+    path.setmtime(path.mtime() + 10)
+    cache.parser_cache.clear()
+    assert cache.load_parser(str(path), None) is not None
+
+    # A copy of the file uses the same cache entry.
+    copy = tmpdir.join('second.py')
+    copy.write(source)
+    cache.parser_cache.clear()
+    parser = cache.load_parser(str(copy), None)
+    assert parser.module.path == str(copy)
+    assert parser.module.name.value == 'second'
+
+    path.write(source + 'bar = 3\n')
+    path.setmtime(path.mtime() + 20)
+    cache.parser_cache.clear()
+    assert cache.load_parser(str(path), None) is None
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_grammar_tables(monkeypatch):
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    monkeypatch.setattr(parser, '_loaded_grammars', {})
+    generated = load_grammar()
+    assert generated is load_grammar()
+
+    # Another process loads the stored tables instead of generating them.
+    monkeypatch.setattr(parser, '_loaded_grammars', {})
+    monkeypatch.setattr(parser, 'generate_grammar', None)
+    loaded = load_grammar()
+    assert loaded is not generated
+    assert loaded.dfas == generated.dfas
+    assert loaded.labels == generated.labels
+    assert FastParser(loaded, u('def foo():\n    pass\n')).module.subscopes
+
+
+def test_memory_cache_limit(monkeypatch):
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    monkeypatch.setattr(cache, 'pinned_paths', set())
+    monkeypatch.setattr(cache, '_watching_evaluators', weakref.WeakSet())
+    monkeypatch.setattr(cache, '_line_counts', {})
+    monkeypatch.setattr(cache, '_total_lines', 0)
+    monkeypatch.setattr(settings, 'memory_cache_limit', 6)
+
+    class Evaluator(object):
+        evicted_modules = []
+
+    evaluator = Evaluator()
+    cache.watch_evictions(evaluator)
+    grammar = load_grammar()
+    parsers = {}
+    for name in 'abcd':
+        # Three lines each.
+        parsers[name] = FastParser(grammar, u('x = 1\ny = 2\n'), name)
+
+    cache.save_parser(None, 'a', parsers['a'], pickling=False)
+    cache.save_parser(None, 'b', parsers['b'], pickling=False)
+    time.sleep(0.01)
+    assert cache.load_parser(None, 'a') is parsers['a']
+
+    cache.save_parser(None, 'c', parsers['c'], pickling=False)
+    assert sorted(cache.parser_cache) == ['a', 'c']
+    assert evaluator.evicted_modules == [parsers['b'].module]
+    assert cache._line_counts == {'a': 3, 'c': 3}
+    assert cache._total_lines == 6
+
+    # Pinned modules stay, even if they are the least recently used.
+    cache.pin('a')
+    cache.save_parser(None, 'd', parsers['d'], pickling=False)
+    assert sorted(cache.parser_cache) == ['a', 'd']
+
+
 def test_star_import_cache_duration():
     new = 0.01
     old, jedi.settings.star_import_cache_validity = \
@@ -1,3 +1,8 @@
+import inspect
+import sys
+
+import pytest
+
 from jedi._compatibility import builtins, is_py3
 from jedi.parser import load_grammar
 from jedi.parser.tree import Function
@@ -65,3 +70,73 @@ def test_string_literals():
     else:
         assert typ('b""') == 'str'
         assert typ('u""') == 'unicode'
+
+
+def test_member_tables(monkeypatch, isolated_jedi_cache):
+    from jedi.evaluate.compiled import members
+    import math
+    monkeypatch.setattr(members, '_tables', {})
+
+    def names():
+        return [c.name for c in Script('import math; math.').completions()]
+
+    completions = names()
+    assert 'sqrt' in completions
+    assert members.lookup(math)['sqrt'][0] == 'function'
+    assert members.lookup(math)['sqrt'][3] == inspect.getdoc(math.sqrt)
+
+    # Other processes load the tables from the cache directory.
+    def build(obj):
+        raise AssertionError('%s should not be introspected again.' % obj)
+
+    monkeypatch.setattr(members, '_tables', {})
+    monkeypatch.setattr(compiled, '_build_member_table', build)
+    assert names() == completions
+
+
+def test_introspection_workers(monkeypatch, isolated_jedi_cache):
+    import sys
+    from jedi import settings
+    from jedi.evaluate.compiled import sandbox
+    if 'mmap' in sys.modules:
+        pytest.skip('mmap is imported already.')
+    monkeypatch.setattr(settings, 'introspection_workers', 1)
+    try:
+        names = [c.name for c in Script('import mmap; mmap.').completions()]
+        assert 'mmap' in names and 'PAGESIZE' in names
+        names = [c.name for c in Script('import mmap; mmap.mmap.').completions()]
+        assert 'readline' in names
+        assert 'mmap' not in sys.modules
+    finally:
+        sandbox.shutdown()
+
+    # Without the sandbox the module is imported and the stub not used.
+    monkeypatch.setattr(settings, 'introspection_workers', 0)
+    definitions = Script('import mmap; mmap.mmap.readline').goto_definitions()
+    assert [d.in_builtin_module() for d in definitions] == [True]
+
+
+def test_member_tables_saved_once(monkeypatch, isolated_jedi_cache):
+    from jedi.evaluate.compiled import members
+    monkeypatch.setattr(members, '_tables', {})
+    saved = []
+    monkeypatch.setattr(members, '_save',
+                        lambda module, tables: saved.append(module.__name__))
+
+    # The tables of int and object are written together.
+    Script('x = 1\nx.').completions()
+    assert saved == ['builtins' if is_py3 else '__builtin__']
+
+
+def test_member_tables_missing_names(monkeypatch, isolated_jedi_cache):
+    from jedi.evaluate.compiled import members
+    monkeypatch.setattr(members, '_tables', {})
+    Script('import sys; sys.').completions()
+    assert 'ps1' not in members.lookup(sys)
+
+    # Only exists in an interactive interpreter.
+    monkeypatch.setattr(sys, 'ps1', '>>> ', raising=False)
+    definitions = Script('import sys; sys.ps1').goto_definitions()
+    assert [d.name for d in definitions] == ['str']
+    completions = Script('import sys; sys.ps').completions()
+    assert [c.name for c in completions] == ['ps1']
@@ -0,0 +1,71 @@
+"""
+Tests for the search of other modules for usages and dynamic params.
+"""
+import os
+
+import pytest
+
+import jedi
+from jedi import cache
+from jedi import settings
+from jedi.evaluate import imports
+from jedi.parser import parallel
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+@pytest.mark.parametrize('workers', [1, 2])
+def test_usages_parsed_in_parallel(monkeypatch, tmpdir, workers):
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    monkeypatch.setattr(settings, 'dynamic_search_workers', workers)
+    tmpdir.join('base.py').write('def used():\n    pass\n')
+    for i in range(6):
+        tmpdir.join('user%s.py' % i).write('from base import used\nused()\n')
+    for i in range(4):
+        tmpdir.join('other%s.py' % i).write('x = 1\n')
+
+    path = str(tmpdir.join('base.py'))
+    project = jedi.Project()
+    usages = project.script('def used():\n    pass\n', 1, 5, path).usages()
+    assert sorted((os.path.basename(u.module_path), u.line) for u in usages) \
+        == [('base.py', 1)] + [('user%s.py' % i, line)
+                               for i in range(6) for line in (1, 2)]
+    # Only modules that contain the name have been parsed.
+    assert str(tmpdir.join('other0.py')) not in cache.parser_cache
+    if workers > 1:
+        assert cache.ParserPickling.change_times([path + 'x']) == {}
+        assert len(cache.ParserPickling.change_times()) == 6
+
+        # The next search of the project neither starts new processes nor
+        # checks the other files again, which are still not cached.
+        pool = imports._pool
+        monkeypatch.setattr(cache, 'parser_cache', {})
+        monkeypatch.setattr(parallel, 'parse_files', None)
+        script = project.script('def used():\n    pass\n\n', 1, 5, path)
+        assert len(script.usages()) == 13
+        assert imports._pool is pool
+        assert len(project._evaluator.checked_files) == 10
+        assert not jedi.Project()._evaluator.checked_files
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_cached_modules_found_by_index(monkeypatch, tmpdir):
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    tmpdir.join('base.py').write('def used():\n    pass\n')
+    tmpdir.join('user.py').write('from base import used\nused()\n')
+    tmpdir.join('comment.py').write('# used\n')
+    path = str(tmpdir.join('base.py'))
+
+    def usages():
+        script = jedi.Script('def used():\n    pass\n', 1, 5, path)
+        return sorted((os.path.basename(u.module_path), u.line)
+                      for u in script.usages())
+
+    assert usages() == [('base.py', 1), ('user.py', 1), ('user.py', 2)]
+    # comment.py contains the name, but doesn't use it.
+    assert sorted(cache.ParserPickling.find_name('used')) \
+        == [str(tmpdir.join('user.py'))]
+
+    # The cached modules are not read again.
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    monkeypatch.setattr(jedi.evaluate.imports, 'source_to_unicode', None)
+    assert usages() == [('base.py', 1), ('user.py', 1), ('user.py', 2)]
@@ -0,0 +1,34 @@
+"""
+Tests for the limits of the evaluation in :mod:`jedi.evaluate.recursion`.
+"""
+import time
+
+import jedi
+from jedi import settings
+
+
+def test_time_budget(monkeypatch):
+    source = 'def f(x):\n    return x\nf(1)\ndef g(y):\n    y\ng("")\n'
+
+    def infer(project, line, column):
+        script = project.script(source, line, column, 'example.py')
+        return [d.name for d in script.goto_definitions()]
+
+    project = jedi.Project()
+    monkeypatch.setattr(settings, 'time_budget', 0)
+    # Neither functions are executed nor dynamic params are searched.
+    assert infer(project, 3, 4) == []
+    assert infer(project, 5, 5) == []
+
+    # Nothing that has been found without budget is remembered.
+    monkeypatch.setattr(settings, 'time_budget', 1000)
+    assert infer(project, 3, 4) == ['int']
+    assert infer(project, 5, 5) == ['str']
+
+
+def test_time_budget_starts_with_call(monkeypatch):
+    monkeypatch.setattr(settings, 'time_budget', 200)
+    script = jedi.Script('def f(x):\n    return x\nf(1)\n', 3, 4)
+    # Idle time before the call doesn't count.
+    time.sleep(0.3)
+    assert [d.name for d in script.goto_definitions()] == ['int']
@@ -1,9 +1,12 @@
 from textwrap import dedent
 
+import pytest
+
 import jedi
 from jedi._compatibility import u
 from jedi import cache
 from jedi.parser import load_grammar
+from jedi.parser import fast
 from jedi.parser.fast import FastParser
 
 
@@ -66,6 +69,8 @@ def test_split_parts():
         class Mock(FastParser):
             def __init__(self, *args):
                 self.number_of_splits = 0
+                self._lines = []
+                self._parts = []
 
         return tuple(FastParser._split_parts(Mock(None, None), source))
 
@@ -76,6 +81,39 @@ def test_split_parts():
     test('a\n', 'def b():\n pass\n', 'c\n')
 
 
+def test_split_parts_incremental():
+    class Mock(FastParser):
+        def __init__(self, *args):
+            self.number_of_splits = 0
+            self._lines = []
+            self._parts = []
+
+    def splits(parser, source):
+        return list(FastParser._split_parts(parser, source))
+
+    before = dedent('''\
+    a = 1
+
+    def b():
+        pass
+
+    class C():
+        def d(self):
+            return (1,
+    def x(): pass
+                    2)
+
+    e = \\
+    ''')
+    parser = Mock(None, None)
+    splits(parser, before)
+    for old, new in [('a = 1', 'a = (1'), ('pass', 'pass\ndef f():'),
+                     ('class C():\n', ''), ('2)', '2'), ('e', '@d\ne')]:
+        source = before.replace(old, new)
+        assert splits(parser, source) == splits(Mock(None, None), source)
+        assert ''.join(splits(parser, before)) == before
+
+
 def check_fp(src, number_parsers_used, number_of_splits=None, number_of_misses=0):
     if number_of_splits is None:
         number_of_splits = number_parsers_used
@@ -127,6 +165,64 @@ def test_positions():
     assert m.end_pos == (1, 1)
 
 
+def test_apply_edit():
+    src = u(dedent('''\
+    def a():
+        return 1
+
+    def b():
+        return 2
+    '''))
+    p = FastParser(load_grammar(), src)
+
+    assert p.apply_edit((2, 11), (2, 12), u('10')) == src.replace('1', '10')
+    assert p.number_parsers_used == 1
+    assert p.module.get_code() == src.replace('1', '10')
+
+    # Adding lines moves the functions after the edit.
+    p.apply_edit((1, 0), (1, 0), u('x = 3\n\n'))
+    assert p.number_parsers_used == 1
+    a, b = p.module.subscopes
+    assert a.start_pos == (3, 0)
+    assert b.start_pos == (6, 0)
+    assert b.get_code() == u('def b():\n    return 2\n')
+
+    with pytest.raises(ValueError):
+        p.apply_edit((2, 0), (20, 0), u(''))
+    with pytest.raises(ValueError):
+        p.apply_edit((2, 1), (2, 0), u(''))
+    # The column after the end of a line is within the line break.
+    with pytest.raises(ValueError):
+        p.apply_edit((1, 9), (1, 9), u(''))
+
+
+def test_apply_edit_crlf():
+    src = u('def a():\r\n    return 1\r\n\r\ndef b():\r\n    return 2\r\n')
+    p = FastParser(load_grammar(), src)
+    new = p.apply_edit((2, 11), (2, 12), u('10'))
+    assert new == src.replace('1', '10')
+    assert p.module.get_code() == new
+    assert p.number_parsers_used == 1
+    with pytest.raises(ValueError):
+        p.apply_edit((2, 14), (2, 14), u(''))
+
+
+def test_parse_without_cache_lock(monkeypatch):
+    owned = []
+
+    class Tokenizer(fast.FastTokenizer):
+        def __init__(self, source):
+            owned.append(cache._lock._is_owned())
+            super(Tokenizer, self).__init__(source)
+
+    monkeypatch.setattr(fast, 'FastTokenizer', Tokenizer)
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    p = FastParser(load_grammar(), u('def a():\n    pass\n'), 'locked.py')
+    cache.save_parser(None, 'locked.py', p, pickling=False)
+    FastParser(load_grammar(), u('def b():\n    pass\n'), 'locked.py')
+    assert owned == [False, False]
+
+
 def test_if():
     src = dedent('''\
     def func():
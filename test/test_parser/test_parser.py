@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 import sys
 
+import pytest
+
 import jedi
 from jedi._compatibility import u, is_py3
+from jedi import settings
 from jedi.parser import Parser, load_grammar
 from jedi.parser.user_context import UserContextParser
 from jedi.parser import tree as pt
@@ -207,3 +210,56 @@ def test_param_splitting():
 def test_unicode_string():
     s = pt.String(None, u('bö'), (0, 0))
     assert repr(s)  # Should not raise an Error!
+
+
+def test_table_driven_parser(monkeypatch):
+    """
+    The table driven parser has to produce the same tree as the normal one,
+    error recovery included.
+    """
+    def dump(node):
+        try:
+            return node.type, [dump(c) for c in node.children]
+        except AttributeError:
+            return node.type, node.value, node.start_pos, node.prefix
+
+    def parse(source):
+        module = Parser(load_grammar(), u(source)).module
+        return dump(module), [e.first_pos for e in module.error_statement_stacks]
+
+    source = dedent('''\
+    @decorator
+    def f(a, *args, b=3):
+        return [x for x in a if x], lambda: (yield)
+
+    class C(object):
+        def g(self:
+            pass
+        x = 1 +
+
+    with open() as f:
+        f.
+    ''')
+    monkeypatch.setattr(settings, 'table_driven_parser', False)
+    expected = parse(source)
+    monkeypatch.setattr(settings, 'table_driven_parser', True)
+    assert parse(source) == expected
+
+
+def test_leaf_positions():
+    leaf = pt.Name(pt.zero_position_modifier, u('foo'), (3, 70000))
+    assert leaf.start_pos == (3, 70000)
+    assert leaf.end_pos == (3, 70003)
+    leaf.move(-2, -5)
+    assert leaf.start_pos == (1, 69995)
+    leaf.start_pos = (10 ** 6, 0)
+    assert leaf.start_pos == (10 ** 6, 0)
+
+
+@pytest.mark.skipif('not is_py3')
+def test_leaf_strings_interned():
+    module = Parser(load_grammar(), u('def foo():\n    foo = 1\n    foo\n')).module
+    names = module.used_names['foo']
+    assert len(names) == 3
+    assert names[0].value is names[1].value is names[2].value
+    assert names[1].prefix is names[2].prefix
@@ -0,0 +1,111 @@
+from textwrap import dedent
+
+import pytest
+
+from jedi._compatibility import u
+from jedi.parser import Parser, load_grammar
+from jedi.parser.fast import FastParser
+from jedi.parser import serialize
+from jedi.parser.tree import Node
+
+
+code = u(dedent('''
+    """A module docstring"""
+    import os
+
+    class Foo(object):
+        def __init__(self, a, b=3, *args, **kwargs):
+            self.a = a
+            f = lambda x, y: x + y
+
+        def bar(self):
+            return [x for x in self.a]
+
+    def broken(
+        def other():
+            pass
+
+    if os:
+        global g
+        g = Foo(1)
+    '''))
+
+
+def leaves(node):
+    try:
+        children = node.children
+    except AttributeError:
+        return [(type(node), node.value, node.prefix, node.start_pos)]
+    return [(type(node), node.type)] + [l for c in children for l in leaves(c)]
+
+
+def names_dicts(module):
+    return [(scope.start_pos,
+             sorted((key, [n.start_pos for n in names])
+                    for key, names in scope.names_dict.items()))
+            for scope in module.walk()]
+
+
+@pytest.mark.parametrize('parser_cls', [Parser, FastParser])
+def test_round_trip(parser_cls):
+    parser = parser_cls(load_grammar(), code, 'example.py')
+    loaded = serialize.loads(serialize.dumps(parser))
+
+    module = loaded.module
+    assert module.get_code() == parser.module.get_code()
+    assert module.path == 'example.py'
+    assert leaves(module) == leaves(parser.module)
+    assert names_dicts(module) == names_dicts(parser.module)
+    assert sorted(module.used_names) == sorted(parser.module.used_names)
+    assert [n.start_pos for n in module.global_names] == [(18, 11)]
+    assert [e.first_pos for e in module.error_statement_stacks] \
+        == [e.first_pos for e in parser.module.error_statement_stacks]
+
+    func = module.subscopes[0].subscopes[0]
+    assert [p.name.value for p in func.params] == ['self', 'a', 'b', 'args', 'kwargs']
+    assert func.params[0].parent_function is func
+
+
+def test_fast_parser_update_after_loading():
+    parser = FastParser(load_grammar(), code, 'example.py')
+    loaded = serialize.loads(serialize.dumps(parser))
+
+    new_code = code + u('def new():\n    pass\n')
+    loaded.update(new_code)
+    parser.update(new_code)
+    assert loaded.module.get_code() == parser.module.get_code()
+    # Only the changed part has to be parsed again.
+    assert loaded.number_parsers_used == 1
+    assert [s.name.value for s in loaded.module.subscopes][-1] == 'new'
+
+
+def test_strings_are_shared():
+    parser = Parser(load_grammar(), u('foo = 1\nfoo = 2\n'))
+    module = serialize.loads(serialize.dumps(parser)).module
+    first, second = module.used_names['foo']
+    assert first.value is second.value
+
+
+def test_unknown_data():
+    with pytest.raises(ValueError):
+        serialize.loads(b'no parser')
+    with pytest.raises(TypeError):
+        serialize.dumps('no parser')
+
+
+def test_lazy_function_bodies():
+    parser = Parser(load_grammar(), code)
+    module = serialize.loads(serialize.dumps(parser)).module
+    func = module.subscopes[0].subscopes[1]
+    body = func.children[-1]
+    assert type(body) is serialize._LazyBody
+
+    # Looking up names of the module doesn't decode the body.
+    assert [n.start_pos for n in module.names_dict['Foo']] == [(5, 6), (19, 8)]
+    assert type(body) is serialize._LazyBody
+
+    # The names of the function are in its body.
+    assert [n.start_pos for n in func.names_dict['x']] == [(11, 16)]
+    assert type(body) is Node
+    assert body.children[1].parent is body
+    assert body.get_code() == '\n        return [x for x in self.a]\n'